@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+
+from core.config import ANALYSIS_DEADLINE_SECONDS
+from core.graph import analysis_graph, generate_question, route_node
+from core.llm import afinal_scorer_agent, FAILED_SENTIMENT, FAILED_VERIFICATION
+from core.timeline import stage
+from core.scorecard import update_scorecard
+
+# --- Background Answer Analysis ---
+# The next question never reads the analysis of the last answer, so in
+# background mode each turn's analysis runs as a task once the next question
+# has been generated, while the candidate reads and answers it. Tasks for one
+# interview run one after another (turn N+1 starts from turn N's scorecard and
+# summary), and their results are only awaited when the final report needs
+# them. Results are kept by turn index: entry i of each list is turn i's.
+ANALYSIS_FIELDS = ("sentiment_analyses", "verifications", "scorecard", "conversation_summary", "summarized_turns")
+
+# Analyzers of the interviews connected to this worker. A reconnect (e.g. a page
+# refresh) takes over the previous connection's analyzer, so the analyses it
+# still has running carry on into the new connection.
+_analyzers: dict[int, "BackgroundAnalyzer"] = {}
+
+def unanalyzed_turns(state: dict) -> list[dict]:
+    """The answered turns of `state` that have no analysis yet, as states for `BackgroundAnalyzer.submit`."""
+    history = state["conversation_history"]
+    analyzed = min(len(state.get("sentiment_analyses", [])), len(state.get("verifications", [])))
+    return [{
+        "conversation_history": history[:turn_index + 1],
+        "current_question": history[turn_index]["question"],
+        "candidate_answer": history[turn_index]["answer"],
+        "job_context_summary": state["job_context_summary"],
+    } for turn_index in range(analyzed, len(history))]
+
+class BackgroundAnalyzer:
+    """Runs the analysis graph for each answered turn of one interview as a background task."""
+
+    def __init__(self, state: dict, on_turn_analyzed=None):
+        # Analysis results live here until merged back into the interview state
+        self.state = {field: state[field] for field in ANALYSIS_FIELDS if field in state}
+        self.state.setdefault("sentiment_analyses", [])
+        self.state.setdefault("verifications", [])
+        self._on_turn_analyzed = on_turn_analyzed
+        self._tail: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.owner = None
+
+    @classmethod
+    def attach(cls, interview_id: int, state: dict, owner, on_turn_analyzed=None) -> tuple["BackgroundAnalyzer", bool]:
+        """Returns (analyzer, taken_over): the interview's live analyzer, taken over from an
+        earlier connection on this worker, or a new one."""
+        analyzer = _analyzers.get(interview_id)
+        taken_over = analyzer is not None
+        if not taken_over:
+            analyzer = _analyzers[interview_id] = cls(state, on_turn_analyzed)
+        analyzer.owner = owner
+        return analyzer, taken_over
+
+    async def detach(self, interview_id: int, owner) -> bool:
+        """Ends `owner`'s use of the analyzer: waits for queued analyses (up to the deadline),
+        then cancels the rest. Returns False if another connection has taken it over meanwhile."""
+        await self.join(ANALYSIS_DEADLINE_SECONDS)
+        if self.owner is not owner:
+            return False
+        if _analyzers.get(interview_id) is self:
+            del _analyzers[interview_id]
+        await self.cancel()
+        return True
+
+    def submit(self, state: dict, **context):
+        """Queues analysis of the latest answer in `state`; `context` is passed to the callback."""
+        turn_state = {
+            "conversation_history": list(state["conversation_history"]),
+            "current_question": state["current_question"],
+            "candidate_answer": state["candidate_answer"],
+            "job_context_summary": state["job_context_summary"],
+            "next_action": state.get("next_action"),
+        }
+        turn_index = len(turn_state["conversation_history"]) - 1
+        self._tail = asyncio.create_task(self._analyze(self._tail, turn_index, turn_state, context))
+        self._tasks.add(self._tail)
+        self._tail.add_done_callback(self._tasks.discard)
+
+    def _pad_to(self, turn_count: int):
+        """Records every turn before `turn_count` that has no analysis as not assessed (unscored)."""
+        while min(len(self.state["sentiment_analyses"]), len(self.state["verifications"])) < turn_count:
+            self.state["sentiment_analyses"] = self.state["sentiment_analyses"] + [FAILED_SENTIMENT]
+            self.state["verifications"] = self.state["verifications"] + [FAILED_VERIFICATION]
+            self.state["scorecard"] = update_scorecard(self.state.get("scorecard"), FAILED_VERIFICATION, FAILED_SENTIMENT)
+
+    async def _analyze(self, previous: asyncio.Task | None, turn_index: int, turn_state: dict, context: dict):
+        if previous is not None:
+            await asyncio.wait([previous])
+        started = time.perf_counter()
+        try:
+            result = await analysis_graph.ainvoke({**turn_state, **self.state})
+            self.state = {field: result[field] for field in ANALYSIS_FIELDS if field in result}
+        except Exception as e:
+            logging.warning(f"Analysis of turn {turn_index} failed: {e}")
+            self._pad_to(turn_index + 1)
+        self._report(turn_index, round((time.perf_counter() - started) * 1000), context)
+
+    def _report(self, turn_index: int, analysis_ms: int | None, context: dict):
+        if self._on_turn_analyzed is not None:
+            try:
+                self._on_turn_analyzed(turn_index, self.state, analysis_ms, **context)
+            except Exception as e:
+                logging.error(f"Turn {turn_index} analysis callback failed: {e}")
+
+
+    async def join(self, timeout: float) -> dict:
+        """Waits up to `timeout` seconds for queued analyses and returns the results so far."""
+        if self._tail is not None:
+            done, _ = await asyncio.wait([self._tail], timeout=timeout)
+            if not done:
+                logging.warning(f"Answer analysis still running after {timeout}s; reporting what has finished.")
+        return dict(self.state)
+
+    async def cancel(self):
+        """Cancels the analyses still queued or running. Their turns stay unanalyzed in the saved
+        session and are submitted again when the interview resumes (see `unanalyzed_turns`)."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def run_turn_with_background_analysis(state: dict, analyzer: BackgroundAnalyzer, on_delta=None, **context) -> dict:
+    """One turn in background-analysis mode: route, queue the analysis, then ask the next question
+    (or wait for the analyses and write the final report). Returns the updated state."""
+    state = {**state, **route_node(state)}
+    if state["next_action"] == "end_interview":
+        analyzer.submit(state, **context)
+        state.update(await analyzer.join(ANALYSIS_DEADLINE_SECONDS))
+        with stage("report"):
+            state.update(await afinal_scorer_agent(state))
+    else:
+        question_update = await generate_question(state, on_delta)
+        # Queued only once the turn has succeeded, so a failed turn can be retried
+        analyzer.submit(state, **context)
+        state.update(question_update)
+        # Merge whatever analysis has finished so the saved session is current
+        state.update(analyzer.state)
+    return state
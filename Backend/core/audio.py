@@ -184,17 +184,19 @@
 
 
 
+import logging
 import os
+import re
 import struct
 import asyncio
-import tempfile
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 # These are the correct and necessary imports
 from google import genai
 from google.genai import types
-import google.generativeai as genai_legacy
 from dotenv import load_dotenv
+from core.governor import get_governor, estimate_tokens
+from core.metrics import AUDIO_LATENCY, ERRORS
 
 # --- Environment and Setup ---
 load_dotenv()
@@ -203,69 +205,199 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY not found in .env file.")
 
-genai_legacy.configure(api_key=GOOGLE_API_KEY)
+# One shared client for TTS and STT
 tts_client = genai.Client(api_key=GOOGLE_API_KEY)
 
 
-def add_wav_header(audio_data: bytes, sample_rate: int = 24000, bits_per_sample: int = 16) -> bytes:
-    """Prepends a standard WAV header to raw PCM audio data."""
+def wav_header(data_size: int, sample_rate: int = 24000, bits_per_sample: int = 16) -> bytes:
+    """Builds a standard mono WAV header for `data_size` bytes of PCM audio."""
     num_channels = 1
-    data_size = len(audio_data)
     bytes_per_sample = bits_per_sample // 8
     block_align = num_channels * bytes_per_sample
     byte_rate = sample_rate * block_align
-    chunk_size = 36 + data_size
-    header = struct.pack(
+    chunk_size = min(36 + data_size, 0xFFFFFFFF)
+    return struct.pack(
         "<4sI4s4sIHHIIHH4sI",
         b"RIFF", chunk_size, b"WAVE", b"fmt ",
         16, 1, num_channels, sample_rate,
         byte_rate, block_align, bits_per_sample,
         b"data", data_size,
     )
-    return header + audio_data
+
+
+def add_wav_header(audio_data: bytes, sample_rate: int = 24000, bits_per_sample: int = 16) -> bytes:
+    """Prepends a standard WAV header to raw PCM audio data."""
+    return wav_header(len(audio_data), sample_rate, bits_per_sample) + audio_data
+
+
+# --- Streaming TTS ---
+# Audio is synthesized one sentence at a time and yielded as raw PCM frames as
+# soon as they arrive, so playback of sentence N overlaps synthesis of N+1.
+# Only the look-ahead sentence is ever buffered, never the whole clip.
+TTS_MODEL = "gemini-2.5-flash-preview-tts"
+TTS_SAMPLE_RATE = 24000
+TTS_LOOKAHEAD_SENTENCES = 1
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Splits text at sentence boundaries, dropping empty pieces."""
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+
+
+def wav_stream_header(sample_rate: int = TTS_SAMPLE_RATE, bits_per_sample: int = 16) -> bytes:
+    """A WAV header for a stream of unknown length; send it once before the PCM frames."""
+    return wav_header(0xFFFFFFFF, sample_rate, bits_per_sample)
+
+
+async def _tts_chunks(sentence: str):
+    stream = await tts_client.aio.models.generate_content_stream(
+        model=TTS_MODEL,
+        contents=[types.Content(role="user", parts=[types.Part.from_text(text=sentence)])],
+        config=types.GenerateContentConfig(response_modalities=["audio"]),
+    )
+    async for chunk in stream:
+        yield chunk
+
+
+async def _synthesize_sentence(sentence: str, frames: asyncio.Queue):
+    """Streams the PCM audio of one sentence into `frames`, followed by None."""
+    try:
+        governor = get_governor(TTS_MODEL)
+        with AUDIO_LATENCY.time(operation="tts_sentence"):
+            async for chunk in governor.stream(lambda: _tts_chunks(sentence), estimate_tokens(sentence)):
+                if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
+                    part = chunk.candidates[0].content.parts[0]
+                    if part.inline_data and part.inline_data.data:
+                        await frames.put(part.inline_data.data)
+    except Exception as e:
+        ERRORS.inc(component="tts")
+        logging.error(f"An error occurred during TTS generation: {e}")
+    finally:
+        await frames.put(None)
+
+
+async def stream_text_to_speech(text: str) -> AsyncIterator[bytes]:
+    """
+    Yields playable 16-bit mono PCM frames at TTS_SAMPLE_RATE as they arrive.
+    Prefix the stream with `wav_stream_header()` if the client needs a WAV container.
+    """
+    sentences = split_sentences(text)
+    queues: list[asyncio.Queue] = []
+    tasks: list[asyncio.Task] = []
+
+    def start(index: int):
+        frames = asyncio.Queue()
+        queues.append(frames)
+        tasks.append(asyncio.create_task(_synthesize_sentence(sentences[index], frames)))
+
+    try:
+        for index in range(min(TTS_LOOKAHEAD_SENTENCES + 1, len(sentences))):
+            start(index)
+        carry = b""
+        for index in range(len(sentences)):
+            while (data := await queues[index].get()) is not None:
+                # Keep frames aligned to whole 16-bit samples
+                data = carry + data
+                usable = len(data) - len(data) % 2
+                carry = data[usable:]
+                if usable:
+                    yield data[:usable]
+            if len(queues) < len(sentences):
+                start(len(queues))
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 async def text_to_speech(text: str) -> bytes:
     """Converts text to speech and returns a complete WAV file."""
     print(f"Generating audio for text: '{text[:30]}...'")
-    try:
-        model = "gemini-2.5-flash-preview-tts"
-        stream = await asyncio.to_thread(
-            tts_client.models.generate_content_stream,
-            model=model,
-            contents=[types.Content(role="user", parts=[types.Part.from_text(text=text)])],
-            config=types.GenerateContentConfig(response_modalities=["audio"]),
-        )
-        audio_chunks = bytearray()
-        for chunk in stream:
-            if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
-                part = chunk.candidates[0].content.parts[0]
-                if part.inline_data and part.inline_data.data:
-                    audio_chunks.extend(part.inline_data.data)
-        if not audio_chunks:
-            return b""
-        return add_wav_header(bytes(audio_chunks))
-    except Exception as e:
-        print(f"An error occurred during TTS generation: {e}")
+    frames = [frame async for frame in stream_text_to_speech(text)]
+    if not frames:
         return b""
+    # A single join copies the audio once
+    header = wav_header(sum(len(frame) for frame in frames), TTS_SAMPLE_RATE)
+    return b"".join([header, *frames])
+
+
+# --- In-memory STT ---
+# Audio is sent inline with the request instead of being written to a temp file
+# and uploaded, so a transcription is one async round trip with no disk I/O.
+STT_MODEL = "gemini-1.5-flash"
+STT_PROMPT = "Transcribe this audio."
+STT_PARTIAL_INTERVAL_BYTES = 32 * 1024
 
 
-async def speech_to_text(audio_bytes: bytes) -> str:
-    """Transcribes audio by saving to a temporary file."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_audio_file:
-        temp_audio_file.write(audio_bytes)
-        temp_file_path = temp_audio_file.name
+async def speech_to_text(audio_bytes: bytes, mime_type: str = "audio/webm") -> str:
+    """Transcribes audio held in memory."""
+    if not audio_bytes:
+        return ""
     try:
-        stt_model = genai_legacy.GenerativeModel('models/gemini-1.5-flash')
-        audio_file = genai_legacy.upload_file(path=temp_file_path, mime_type="audio/webm")
-        response = stt_model.generate_content(["Transcribe this audio.", audio_file])
-        genai_legacy.delete_file(audio_file.name)
+        with AUDIO_LATENCY.time(operation="stt"):
+            response = await get_governor(STT_MODEL).call(
+                lambda: tts_client.aio.models.generate_content(
+                    model=STT_MODEL,
+                    contents=[STT_PROMPT, types.Part.from_bytes(data=audio_bytes, mime_type=mime_type)],
+                )
+            )
         return response.text.strip() if response.text else ""
     except Exception as e:
-        print(f"An error occurred during transcription: {e}")
+        ERRORS.inc(component="stt")
+        logging.error(f"An error occurred during transcription: {e}")
         return ""
-    finally:
-        os.unlink(temp_file_path)
+
+
+class StreamingTranscriber:
+    """
+    Collects audio chunks while the candidate is still talking. Every
+    STT_PARTIAL_INTERVAL_BYTES of new audio, the recording so far is transcribed in
+    the background and passed to `on_partial`; `finish()` returns the final text.
+    Chunks must concatenate into a valid stream (e.g. MediaRecorder webm slices).
+    """
+
+    def __init__(
+        self,
+        mime_type: str = "audio/webm",
+        on_partial: Optional[Callable[[str], Awaitable[None]]] = None,
+        partial_interval_bytes: int = STT_PARTIAL_INTERVAL_BYTES,
+    ):
+        self.mime_type = mime_type
+        self.on_partial = on_partial
+        self.partial_interval_bytes = partial_interval_bytes
+        self.partial_text = ""
+        self._buffer = bytearray()
+        self._partial_size = 0
+        self._transcribed_size = 0
+        self._partial_task: Optional[asyncio.Task] = None
+
+    def feed(self, chunk: bytes):
+        """Adds a chunk of audio; may start a background partial transcription."""
+        self._buffer.extend(chunk)
+        idle = self._partial_task is None or self._partial_task.done()
+        if idle and len(self._buffer) - self._partial_size >= self.partial_interval_bytes:
+            self._partial_size = len(self._buffer)
+            self._partial_task = asyncio.create_task(self._transcribe_partial(bytes(self._buffer)))
+
+    async def _transcribe_partial(self, audio_bytes: bytes):
+        text = await speech_to_text(audio_bytes, self.mime_type)
+        if text:
+            self.partial_text = text
+            self._transcribed_size = len(audio_bytes)
+            if self.on_partial:
+                await self.on_partial(text)
+
+    async def finish(self) -> str:
+        """Returns the final transcript of everything fed so far."""
+        if self._partial_task and not self._partial_task.done():
+            if self._partial_size == len(self._buffer):
+                # The in-flight partial already covers all the audio
+                await self._partial_task
+            else:
+                self._partial_task.cancel()
+        if self.partial_text and self._transcribed_size == len(self._buffer):
+            return self.partial_text
+        return await speech_to_text(bytes(self._buffer), self.mime_type)
 
 
 async def initialize_audio_system():
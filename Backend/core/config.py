@@ -0,0 +1,112 @@
+import os
+import json
+from dotenv import load_dotenv
+
+# --- Runtime Configuration (overridable through the environment / .env) ---
+load_dotenv()
+
+def _flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "1" if default else "0").strip().lower() in ("1", "true", "yes", "on")
+
+# --- Server ---
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Number of worker processes. Above 1, reload is disabled and interview state
+# must live in a shared session store (the default switches to "database").
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+SERVER_RELOAD = _flag("SERVER_RELOAD", True) and WEB_CONCURRENCY == 1
+# Worker recycling: a worker exits after this many requests (plus jitter) and is replaced.
+# Off by default: a recycled worker closes its open WebSockets at once (code 1012,
+# whatever GRACEFUL_SHUTDOWN_SECONDS says), ending every live interview on it.
+# Only with several workers: a single process has no supervisor to replace it.
+MAX_REQUESTS_PER_WORKER = (int(os.getenv("MAX_REQUESTS_PER_WORKER", "0")) or None) if WEB_CONCURRENCY > 1 else None
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "30"))
+# Shared directory through which the workers combine their /metrics (see
+# core/metrics.py). `python main.py` creates a fresh one for multi-worker runs.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# --- Interview ---
+# Number of answered questions after which the interview ends
+INTERVIEW_MAX_QUESTIONS = int(os.getenv("INTERVIEW_MAX_QUESTIONS", "5"))
+# Most recent turns kept verbatim in prompts; older ones are folded into a
+# rolling summary so prompt size stays flat however long the interview runs.
+# At least 1: the current turn is never summarized before its verdict exists.
+SUMMARY_RECENT_TURNS = max(1, int(os.getenv("SUMMARY_RECENT_TURNS", "2")))
+
+# How each answer is analyzed: "combined" (sentiment and verification in one
+# structured call) or "separate" (one call per analysis)
+ASSESSMENT_MODE = os.getenv("ASSESSMENT_MODE", "combined").strip().lower()
+
+# Sentiment labels from "llm" (the sentiment agent) or "local" (a lexicon
+# classifier, no network call). With "local", this fraction of answers is also
+# labelled by the LLM to track how often the two agree.
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "llm").strip().lower()
+SENTIMENT_SHADOW_RATE = float(os.getenv("SENTIMENT_SHADOW_RATE", "0"))
+
+# Analyze each answer in a background task while the next question is being
+# generated; the results are only awaited (up to the deadline) for the final report
+BACKGROUND_ANALYSIS = _flag("BACKGROUND_ANALYSIS", True)
+ANALYSIS_DEADLINE_SECONDS = float(os.getenv("ANALYSIS_DEADLINE_SECONDS", "30"))
+
+# Stream the interviewer's questions to the client as incremental deltas
+STREAM_QUESTIONS = _flag("STREAM_QUESTIONS", True)
+
+# --- Models ---
+# Per-agent model overrides as JSON, e.g. AGENT_MODELS='{"verifier": "gemini-2.5-pro"}'
+AGENT_MODEL_OVERRIDES = json.loads(os.getenv("AGENT_MODELS", "{}"))
+# Tiering: the verifier, the combined assessor and the final scorer try the fast
+# model first and escalate to their own (stronger) model only when needed.
+# AGENT_FAST_MODELS overrides the fast model per agent, as JSON.
+MODEL_TIERING = _flag("MODEL_TIERING", True)
+FAST_MODEL = os.getenv("FAST_MODEL", "gemini-2.5-flash")
+AGENT_FAST_MODEL_OVERRIDES = json.loads(os.getenv("AGENT_FAST_MODELS", "{}"))
+# Escalate verification when the fast model's confidence is below this...
+ESCALATION_MIN_CONFIDENCE = float(os.getenv("ESCALATION_MIN_CONFIDENCE", "0.7"))
+# ...and skip the fast model entirely for answers longer than this
+ESCALATION_ANSWER_CHARS = int(os.getenv("ESCALATION_ANSWER_CHARS", "1500"))
+
+# Cache for temperature-0 LLM responses: an in-process LRU in front of a SQLite
+# file shared by all workers
+LLM_CACHE_ENABLED = _flag("LLM_CACHE_ENABLED", True)
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "2048"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+
+# Gemini call governor (core/governor.py). MODEL_LIMITS may be overridden with a
+# JSON object of {model: {"rpm": ..., "tpm": ..., "concurrency": ...}}; models
+# not listed use "default".
+MODEL_LIMITS = {
+    "default": {
+        "rpm": int(os.getenv("GEMINI_RPM", "1000")),
+        "tpm": int(os.getenv("GEMINI_TPM", "1000000")),
+        "concurrency": int(os.getenv("GEMINI_MAX_CONCURRENCY", "32")),
+    },
+    "gemini-1.5-pro": {"rpm": 360, "tpm": 4000000, "concurrency": 16},
+    **json.loads(os.getenv("MODEL_LIMITS", "{}")),
+}
+GOVERNOR_MAX_RETRIES = int(os.getenv("GOVERNOR_MAX_RETRIES", "4"))
+GOVERNOR_BACKOFF_BASE_SECONDS = float(os.getenv("GOVERNOR_BACKOFF_BASE_SECONDS", "0.5"))
+GOVERNOR_BACKOFF_MAX_SECONDS = float(os.getenv("GOVERNOR_BACKOFF_MAX_SECONDS", "8"))
+# Extra attempts when a structured response cannot be parsed
+GOVERNOR_PARSE_RETRIES = int(os.getenv("GOVERNOR_PARSE_RETRIES", "1"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+# Queued low-priority model calls move up one priority level per this many seconds
+SCHEDULER_AGING_SECONDS = float(os.getenv("SCHEDULER_AGING_SECONDS", "10"))
+
+# PDF uploads: extraction runs in a process pool, page ranges in parallel.
+# Each server worker has its own pool.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "30"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024
+
+# Where live interview state is kept between turns: "memory" (in-process LRU),
+# "database" (the app database) or "redis" (any Redis-protocol server)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory" if WEB_CONCURRENCY == 1 else "database").strip().lower()
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(24 * 60 * 60)))
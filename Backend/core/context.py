@@ -0,0 +1,65 @@
+import hashlib
+from collections import OrderedDict
+from sqlalchemy import select, update
+
+from core.database import AsyncSessionLocal
+from models.models import Resume
+from core.llm import AGENT_MODELS, acontext_analyzer_agent
+
+# --- Context Summary Cache ---
+# The context analysis only depends on the resume, the job description and the
+# model, so it is computed once per combination and stored on the Resume row.
+# Reconnects and repeat uploads of the same resume/JD pair reuse it.
+SUMMARY_CACHE_SIZE = 512
+_summary_cache: OrderedDict[str, dict] = OrderedDict()
+
+def context_cache_key(resume_text: str, job_description: str | None) -> str:
+    """Hashes resume text + job description + context model into a cache key."""
+    model, _ = AGENT_MODELS["context_analyzer"]
+    digest = hashlib.sha256()
+    for part in (model, resume_text, job_description or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _remember(key: str, summary: dict):
+    _summary_cache[key] = summary
+    _summary_cache.move_to_end(key)
+    while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+
+async def get_context_summary(resume: Resume) -> dict:
+    """Returns the cached `ContextSummary` for this interview, running the agent only on a miss."""
+    key = context_cache_key(resume.resume_text, resume.job_description)
+    if resume.context_cache_key == key and resume.parsed_resume:
+        _remember(key, resume.parsed_resume)
+        return resume.parsed_resume
+
+    summary = _summary_cache.get(key)
+    if summary is None:
+        # Another upload of the same resume/JD pair may already have been analyzed
+        async with AsyncSessionLocal() as db:
+            summary = await db.scalar(
+                select(Resume.parsed_resume)
+                .where(Resume.context_cache_key == key, Resume.parsed_resume.isnot(None))
+                .limit(1)
+            )
+    if summary is None:
+        # No session is held open while the LLM runs
+        agent_update = await acontext_analyzer_agent({
+            "resume_text": resume.resume_text,
+            "job_description": resume.job_description,
+        })
+        summary = agent_update["job_context_summary"]
+
+    _remember(key, summary)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Resume)
+            .where(Resume.interview_id == resume.interview_id)
+            .values(parsed_resume=summary, context_cache_key=key)
+        )
+        await db.commit()
+    resume.parsed_resume = summary
+    resume.context_cache_key = key
+    return summary
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+from langchain_core.exceptions import OutputParserException
+
+from core.scheduler import PriorityScheduler, INTERACTIVE
+from core.config import (
+    MODEL_LIMITS,
+    GOVERNOR_MAX_RETRIES,
+    GOVERNOR_BACKOFF_BASE_SECONDS,
+    GOVERNOR_BACKOFF_MAX_SECONDS,
+    GOVERNOR_PARSE_RETRIES,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_SECONDS,
+)
+
+# --- Gemini Call Governor ---
+# Every model call (agents in core/llm.py, TTS/STT in core/audio.py) goes
+# through the governor of its model, which applies, in order:
+#   - a circuit breaker: after repeated failed calls (retries exhausted; rate
+#     limits excluded, the buckets and backoff handle those) the model is failed
+#     fast for a cool-down period instead of piling more requests onto it;
+#   - a concurrency limit whose slots are handed out by priority and
+#     per-interview fairness (core/scheduler.py);
+#   - token buckets for requests and tokens per minute;
+#   - retries with exponential backoff and full jitter for rate limits (429),
+#     overload (503) and timeouts, and a quick re-ask for unparseable output.
+# Under a spike, calls queue and slow down rather than all failing at once.
+_RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_MARKERS = ("429", "503", "resource_exhausted", "resource exhausted", "unavailable", "overloaded", "deadline", "timed out")
+_RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "resource exhausted", "rate limit")
+CHARS_PER_TOKEN = 4
+DEFAULT_OUTPUT_TOKENS = 256
+
+class ModelUnavailableError(Exception):
+    """The model's circuit breaker is open; the call was not attempted."""
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if isinstance(code, int):
+        return code in _RETRYABLE_CODES
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in _RETRYABLE_MARKERS)
+
+def is_rate_limited(error: Exception) -> bool:
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if isinstance(code, int):
+        return code == 429
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in _RATE_LIMIT_MARKERS)
+
+def estimate_tokens(*parts) -> int:
+    """Rough token estimate for the request budget: prompt characters / 4 plus an output allowance."""
+    return sum(len(str(part)) for part in parts) // CHARS_PER_TOKEN + DEFAULT_OUTPUT_TOKENS
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to `capacity`; `acquire` waits for enough units."""
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; after `reset_seconds` one probe call is let through."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self):
+        """Ends a probe call that neither succeeded nor failed (cancelled, or rate limited)."""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            if self.opened_at is None:
+                logging.warning(f"Circuit breaker opened after {self.failures} consecutive failures.")
+            self.opened_at = time.monotonic()
+
+class ModelGovernor:
+    """Rate limits, concurrency cap, retries and circuit breaker for one model."""
+
+    def __init__(self, model: str, rpm: int, tpm: int, concurrency: int):
+        self.model = model
+        self.concurrency = concurrency
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.scheduler = PriorityScheduler(concurrency)
+        self.breaker = CircuitBreaker()
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0, "parse_retries": 0}
+
+    def _check_breaker(self) -> bool:
+        """Raises while the circuit is open. Returns True when this call is the half-open probe."""
+        probe = self.breaker.state != "closed"
+        if not self.breaker.allow():
+            self.stats["rejected"] += 1
+            raise ModelUnavailableError(f"{self.model} is temporarily unavailable (circuit open).")
+        return probe
+
+    async def _rate_limit(self, estimated_tokens: int):
+        # Only slot holders wait here, so queued background work cannot hold up the buckets
+        await self.requests.acquire()
+        await self.tokens.acquire(estimated_tokens)
+
+    async def _backoff(self, attempt: int, error: Exception):
+        self.stats["retries"] += 1
+        delay = random.uniform(0, min(GOVERNOR_BACKOFF_MAX_SECONDS, GOVERNOR_BACKOFF_BASE_SECONDS * 2 ** attempt))
+        logging.warning(f"{self.model} call failed ({error}); retry {attempt + 1} in {delay:.2f}s.")
+        await asyncio.sleep(delay)
+
+    def _record_call_failure(self, error: Exception, probe: bool):
+        """Counts a call that failed for good (retries exhausted) against the breaker."""
+        self.stats["failures"] += 1
+        if not is_rate_limited(error):
+            self.breaker.record_failure()
+        elif probe:
+            self.breaker.release_probe()
+
+    async def call(self, make_call: Callable[[], Awaitable], estimated_tokens: int = DEFAULT_OUTPUT_TOKENS,
+                   priority: int = INTERACTIVE):
+        """Awaits `make_call()` under this model's limits, retrying transient and parser errors."""
+        # One breaker check per call: a probe's own retries must not be rejected
+        probe = self._check_breaker()
+        attempt = 0
+        parse_attempt = 0
+        while True:
+            try:
+                async with self.scheduler.slot(priority):
+                    await self._rate_limit(estimated_tokens)
+                    self.stats["calls"] += 1
+                    result = await make_call()
+            except OutputParserException:
+                # The model answered, so it is healthy; ask again up to GOVERNOR_PARSE_RETRIES times
+                self.breaker.record_success()
+                if parse_attempt >= GOVERNOR_PARSE_RETRIES:
+                    self.stats["failures"] += 1
+                    raise
+                parse_attempt += 1
+                self.stats["parse_retries"] += 1
+                continue
+            except Exception as e:
+                if not is_retryable(e):
+                    # A client-side error: the model itself is reachable
+                    self.breaker.record_success()
+                    self.stats["failures"] += 1
+                    raise
+                if attempt >= GOVERNOR_MAX_RETRIES:
+                    self._record_call_failure(e, probe)
+                    raise
+                await self._backoff(attempt, e)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled: a probe must not keep the breaker half-open forever
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, make_stream: Callable[[], AsyncIterator], estimated_tokens: int = DEFAULT_OUTPUT_TOKENS,
+                     priority: int = INTERACTIVE) -> AsyncIterator:
+        """Iterates `make_stream()` under this model's limits. Retries only before the first item arrives."""
+        probe = self._check_breaker()
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self.scheduler.slot(priority):
+                    await self._rate_limit(estimated_tokens)
+                    self.stats["calls"] += 1
+                    async for item in make_stream():
+                        started = True
+                        yield item
+            except Exception as e:
+                if started or not is_retryable(e) or attempt >= GOVERNOR_MAX_RETRIES:
+                    if is_retryable(e):
+                        self._record_call_failure(e, probe)
+                    else:
+                        self.breaker.record_success()
+                        self.stats["failures"] += 1
+                    raise
+                await self._backoff(attempt, e)
+                attempt += 1
+                continue
+            except BaseException:
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return
+
+_governors: dict[str, ModelGovernor] = {}
+
+def get_governor(model: str) -> ModelGovernor:
+    """Returns the shared governor for a model (limits from MODEL_LIMITS, else the defaults)."""
+    model = model.removeprefix("models/")
+    governor = _governors.get(model)
+    if governor is None:
+        limits = {**MODEL_LIMITS["default"], **MODEL_LIMITS.get(model, {})}
+        governor = ModelGovernor(model, limits["rpm"], limits["tpm"], limits["concurrency"])
+        _governors[model] = governor
+    return governor
+
+def governor_stats() -> dict:
+    return {
+        model: {
+            **governor.stats,
+            "breaker": governor.breaker.state,
+            "in_flight": governor.concurrency - governor.scheduler.free,
+            "queued": governor.scheduler.waiting,
+        }
+        for model, governor in _governors.items()
+    }
@@ -0,0 +1,141 @@
+from typing import TypedDict
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph, START, END
+
+from core.config import ASSESSMENT_MODE, SENTIMENT_BACKEND
+from core.llm import (
+    aassessor_agent,
+    ainterviewer_agent,
+    astream_interviewer_agent,
+    asentiment_analyzer_agent,
+    averifier_agent,
+    router_agent,
+    afinal_scorer_agent,
+    asummarizer_agent,
+    needs_summary
+)
+from core.scorecard import update_scorecard
+from core.timeline import staged
+
+# --- Graph State ---
+class InterviewState(TypedDict, total=False):
+    resume_text: str
+    company_info: str
+    job_description: str
+    job_context_summary: dict
+    conversation_history: list
+    candidate_answer: str
+    current_question: str
+    sentiment_analyses: list
+    verifications: list
+    next_action: str
+    final_report: dict
+    scorecard: dict
+    conversation_summary: str
+    summarized_turns: int
+
+# --- Nodes ---
+# Each node records a stage span on the turn timeline (core/timeline.py)
+@staged("route")
+def route_node(state: InterviewState) -> dict:
+    """Records the router's decision. It only needs the answer and turn count, so it runs first."""
+    return {"next_action": router_agent(state)}
+
+@staged("question")
+async def generate_question(state: InterviewState, on_delta=None) -> dict:
+    """Runs the interviewer, forwarding each text delta to `on_delta` (an async callable) if given."""
+    if on_delta is None:
+        return await ainterviewer_agent(state)
+    parts = []
+    async for delta in astream_interviewer_agent(state):
+        parts.append(delta)
+        await on_delta(delta)
+    return {"current_question": "".join(parts)}
+
+async def interviewer_node(state: InterviewState, config: RunnableConfig) -> dict:
+    """Generates the next question, streaming it when `on_question_delta` is configured."""
+    return await generate_question(state, config.get("configurable", {}).get("on_question_delta"))
+
+@staged("analyze", "scorecard")
+def scorecard_node(state: InterviewState) -> dict:
+    """Joins sentiment analysis and verification, recording the answer on the running scorecard."""
+    return {"scorecard": update_scorecard(
+        state.get("scorecard"), state["verifications"][-1], state["sentiment_analyses"][-1]
+    )}
+
+def _analysis_nodes(assessment_mode: str) -> list[str]:
+    # A local sentiment classifier leaves only the verifier as a remote call
+    if assessment_mode == "combined" and SENTIMENT_BACKEND != "local":
+        return ["assessor"]
+    return ["sentiment_analyzer", "verifier"]
+
+def _branches_for(analysis_nodes: list[str]):
+    def _branches(state: InterviewState) -> list[str]:
+        if state["next_action"] == "end_interview":
+            return analysis_nodes
+        # The summarizer only folds in turns before the current one, whose verdicts are already known
+        return analysis_nodes + ["interviewer"] + (["summarizer"] if needs_summary(state) else [])
+    return _branches
+
+def _after_background_analysis(state: InterviewState) -> str:
+    # Nothing reads the summary after the last turn, and the final report waits for this graph
+    if state.get("next_action") == "end_interview":
+        return END
+    return "summarizer" if needs_summary(state) else END
+
+def _after_analysis(state: InterviewState) -> str:
+    return "final_scorer" if state["next_action"] == "end_interview" else END
+
+# --- Turn Graph ---
+# One candidate answer = one run of this graph. The router is decided up front;
+# sentiment analysis, verification and (when continuing) the next question only
+# read the previous turn, so they run as concurrent branches. In "combined"
+# assessment mode a single assessor call produces both analyses. They are
+# joined into the running scorecard, which the final scorer reads. When a turn
+# leaves the recent window, the summarizer folds it (with its verdict, known
+# since that turn) into the rolling summary that later prompts use instead of
+# the full history; it is another concurrent branch, off the question's path.
+def _add_analysis_nodes(builder: StateGraph, analysis_nodes: list[str]):
+    if analysis_nodes == ["assessor"]:
+        builder.add_node("assessor", staged("analyze", "assessor")(aassessor_agent))
+    else:
+        builder.add_node("sentiment_analyzer", staged("analyze", "sentiment")(asentiment_analyzer_agent))
+        builder.add_node("verifier", staged("analyze", "verifier")(averifier_agent))
+    builder.add_node("scorecard", scorecard_node)
+    builder.add_node("summarizer", staged("analyze", "summarizer")(asummarizer_agent))
+
+def build_turn_graph(assessment_mode: str = ASSESSMENT_MODE):
+    analysis_nodes = _analysis_nodes(assessment_mode)
+    builder = StateGraph(InterviewState)
+    builder.add_node("router", route_node)
+    _add_analysis_nodes(builder, analysis_nodes)
+    builder.add_node("interviewer", interviewer_node)
+    builder.add_node("final_scorer", staged("report")(afinal_scorer_agent))
+
+    builder.add_edge(START, "router")
+    builder.add_conditional_edges("router", _branches_for(analysis_nodes), analysis_nodes + ["interviewer", "summarizer"])
+    builder.add_edge(analysis_nodes, "scorecard")
+    builder.add_conditional_edges("scorecard", _after_analysis, ["final_scorer", END])
+    builder.add_edge("interviewer", END)
+    builder.add_edge("final_scorer", END)
+    builder.add_edge("summarizer", END)
+    return builder.compile()
+
+# --- Analysis Graph ---
+# Background-analysis mode: the route only runs the router and the interviewer
+# on the critical path; this graph analyzes a turn on its own (scorecard and
+# rolling summary included) and is run by `core.analysis.BackgroundAnalyzer`.
+def build_analysis_graph(assessment_mode: str = ASSESSMENT_MODE):
+    analysis_nodes = _analysis_nodes(assessment_mode)
+    builder = StateGraph(InterviewState)
+    _add_analysis_nodes(builder, analysis_nodes)
+
+    for node in analysis_nodes:
+        builder.add_edge(START, node)
+    builder.add_edge(analysis_nodes, "scorecard")
+    builder.add_conditional_edges("scorecard", _after_background_analysis, ["summarizer", END])
+    builder.add_edge("summarizer", END)
+    return builder.compile()
+
+turn_graph = build_turn_graph()
+analysis_graph = build_analysis_graph()
@@ -1,10 +1,34 @@
 import os
+import time
+import asyncio
+import random
 import logging
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.runnables import Runnable
+from langchain_core.language_models import BaseChatModel
 from dotenv import load_dotenv
+from core.config import (
+    INTERVIEW_MAX_QUESTIONS,
+    SUMMARY_RECENT_TURNS,
+    SENTIMENT_BACKEND,
+    SENTIMENT_SHADOW_RATE,
+    AGENT_MODEL_OVERRIDES,
+    MODEL_TIERING,
+    FAST_MODEL,
+    AGENT_FAST_MODEL_OVERRIDES,
+    ESCALATION_MIN_CONFIDENCE,
+    ESCALATION_ANSWER_CHARS,
+)
+from core.sentiment import classify_sentiment, record_comparison
+from core.scorecard import new_scorecard, score, format_scorecard
+from core.llm_cache import llm_cache, deferred_writes, cache_only, CacheMiss
+from core.governor import get_governor, estimate_tokens
+from core.scheduler import INTERACTIVE, ANALYSIS, REPORT, BACKGROUND
+from core.metrics import AGENT_LATENCY, ERRORS, llm_metrics_callback
+from core.timeline import timeline_callback
 
 # --- Setup ---
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -25,105 +49,562 @@ class SentimentAnalysis(BaseModel):
 class AnswerVerification(BaseModel):
     is_correct: bool = Field(description="A boolean indicating if the answer is technically correct.")
     explanation: str = Field(description="A brief explanation for why the answer is correct or incorrect.")
+    topic: str = Field(default="general", description="The main technical topic of the question in one or two words (e.g., Python, SQL, System Design).")
+    confidence: float = Field(default=1.0, description="How confident you are in this verdict, from 0 (guessing) to 1 (certain). Use a low value for ambiguous or partially correct answers.")
 
-class FinalReport(BaseModel):
-    total_questions_asked: int = Field(description="The total number of questions the interviewer asked.")
-    total_correct_answers: int = Field(description="The total number of answers deemed technically correct by the verifier.")
+class AnswerAssessment(BaseModel):
+    sentiment: SentimentAnalysis = Field(description="The sentiment analysis of the answer.")
+    verification: AnswerVerification = Field(description="The technical verification of the answer.")
+
+class ReportNarrative(BaseModel):
     overall_summary: str = Field(description="A 2-3 sentence summary of the candidate's performance, considering their suitability for the role.")
     points_for_improvement: list[str] = Field(description="A bulleted list of 2-3 specific, actionable suggestions for the candidate to improve.")
+
+# The report sent to the client: the counters come from the running scorecard,
+# only the narrative is written by the final scorer.
+class FinalReport(ReportNarrative):
+    total_questions_asked: int = Field(description="The total number of questions the interviewer asked.")
+    total_correct_answers: int = Field(description="The total number of answers deemed technically correct by the verifier.")
+    unscored_answers: int = Field(default=0, description="Answers that could not be assessed and are left out of the score.")
     final_score: int = Field(description="An overall score for the interview from 1-100.")
+    topic_breakdown: dict[str, dict[str, int]] = Field(default_factory=dict, description="Questions asked and answered correctly per topic.")
+    sentiment_trend: list[str] = Field(default_factory=list, description="The sentiment of each answer, in order.")
 
-# --- Agent Functions ---
+# --- Prompts and Parsers (built once at import) ---
+INTERVIEWER_SYSTEM_PROMPT = (
+    "You are 'Akshay', a professional and insightful AI technical interviewer. Your goal is to assess the candidate for a specific role. "
+    "Your questions must be targeted and relevant to the job description and the candidate's projects. "
+    "Adjust the complexity of your questions based on the required experience level for the role. Ask only one question at a time. Do not use phrases like 'we are running out of time'.\n\n"
+    "JOB CONTEXT:\n{job_context}"
+)
 
-def context_analyzer_agent(state: dict) -> dict:
-    """Analyzes the resume, company, and job description to create a holistic summary."""
-    logging.info("---AGENT: Context Analyzer---")
-    parser = PydanticOutputParser(pydantic_object=ContextSummary)
-    prompt = ChatPromptTemplate.from_template(
+def _structured_prompt(template: str, schema: type[BaseModel]):
+    """Returns a prompt with the parser's format instructions already filled in, plus the parser."""
+    parser = PydanticOutputParser(pydantic_object=schema)
+    prompt = ChatPromptTemplate.from_template(template).partial(format_instructions=parser.get_format_instructions())
+    return prompt, parser
+
+_PROMPTS = {
+    "context_analyzer": _structured_prompt(
         "You are an expert HR analyst. Analyze the resume and job description to create a summary of the candidate's profile and their fit for the role.\n"
-        "{format_instructions}\n\nJOB DESCRIPTION: {job_description}\n\nCANDIDATE'S RESUME:\n{resume_text}"
+        "{format_instructions}\n\nJOB DESCRIPTION: {job_description}\n\nCANDIDATE'S RESUME:\n{resume_text}",
+        ContextSummary,
+    ),
+    "interviewer_greeting": (
+        ChatPromptTemplate.from_messages([
+            ("system", INTERVIEWER_SYSTEM_PROMPT),
+            ("human", "Start the interview by greeting {candidate_name}. Thank them for applying and then ask them to briefly introduce themselves."),
+        ]),
+        None,
+    ),
+    "interviewer_follow_up": (
+        ChatPromptTemplate.from_messages([
+            ("system", INTERVIEWER_SYSTEM_PROMPT),
+            ("human", "INTERVIEW SO FAR:\n{interview_so_far}\n\n"
+                      "The last question was: '{question}'. The candidate's answer was: '{answer}'. Now, ask a relevant follow-up question based on their answer or pivot to a new topic from their resume or the job description."),
+        ]),
+        None,
+    ),
+    "sentiment_analyzer": _structured_prompt(
+        "Analyze the sentiment of the candidate's answer. Consider their tone, confidence, and attitude. Provide the sentiment and a brief explanation.\n{format_instructions}\n\nCandidate's Answer: {answer}",
+        SentimentAnalysis,
+    ),
+    "verifier": _structured_prompt(
+        "Is the following answer technically correct? Respond with a boolean, a brief explanation and the question's topic.\n{format_instructions}\n\nQuestion: {question}\nCandidate's Answer: {answer}",
+        AnswerVerification,
+    ),
+    "answer_assessor": _structured_prompt(
+        "Assess the candidate's answer in two ways. First, analyze its sentiment: consider their tone, confidence, and attitude, and give the sentiment with a brief explanation. "
+        "Second, decide whether it is technically correct: give a boolean, a brief explanation and the question's topic.\n{format_instructions}\n\n"
+        "Question: {question}\nCandidate's Answer: {answer}",
+        AnswerAssessment,
+    ),
+    "final_scorer": _structured_prompt(
+        "You are the lead hiring manager. Review the interview scorecard and summary to write the final report: "
+        "a concise overall summary and specific points for improvement.\n{format_instructions}\n\n"
+        "JOB CONTEXT:\n{job_context}\n\n"
+        "SCORECARD:\n{scorecard}\n\n"
+        "INTERVIEW SUMMARY:\n{conversation_summary}\n\n"
+        "MOST RECENT EXCHANGES:\n{recent_exchanges}",
+        ReportNarrative,
+    ),
+    "conversation_summarizer": (
+        ChatPromptTemplate.from_template(
+            "You maintain a ROLLING SUMMARY of a technical interview. Update the current summary with the new exchanges below. "
+            "Keep the topics covered, how well each was answered and any notable strengths or gaps. "
+            "Reply with the updated summary only, in at most 150 words.\n\n"
+            "CURRENT SUMMARY:\n{summary}\n\nNEW EXCHANGES:\n{exchanges}"
+        ),
+        None,
+    ),
+}
+
+# Default (model, temperature) for each prompt.
+AGENT_MODELS = {
+    "context_analyzer": (GEMINI_MODEL, 0),
+    "interviewer_greeting": (GEMINI_MODEL, 0.8),
+    "interviewer_follow_up": (GEMINI_MODEL, 0.8),
+    "sentiment_analyzer": (GEMINI_MODEL, 0),
+    "verifier": ("gemini-1.5-pro", 0),
+    "answer_assessor": ("gemini-1.5-pro", 0),
+    "final_scorer": ("gemini-1.5-pro", 0.2),
+    "conversation_summarizer": (GEMINI_MODEL, 0),
+}
+
+# Agents that try a fast model before their own; see `_tiered_ainvoke`.
+TIERED_AGENT_NAMES = ("verifier", "answer_assessor", "final_scorer")
+
+def _check_override_names(variable: str, overrides: dict, valid_names):
+    # A misspelled agent name would otherwise crash with a bare KeyError or be silently ignored
+    unknown = sorted(set(overrides) - set(valid_names))
+    if unknown:
+        raise ValueError(f"{variable} has unknown agent names {unknown}. Valid names: {sorted(valid_names)}.")
+
+_check_override_names("AGENT_MODELS", AGENT_MODEL_OVERRIDES, _PROMPTS)
+_check_override_names("AGENT_FAST_MODELS", AGENT_FAST_MODEL_OVERRIDES, TIERED_AGENT_NAMES)
+
+for _name, _model in AGENT_MODEL_OVERRIDES.items():
+    AGENT_MODELS[_name] = (_model, AGENT_MODELS[_name][1])
+
+TIERED_AGENTS = {name: AGENT_FAST_MODEL_OVERRIDES.get(name, FAST_MODEL) for name in TIERED_AGENT_NAMES}
+
+# --- Shared LLM Clients and Chains ---
+# Clients are keyed by (model, temperature) and chains by (prompt, model,
+# temperature). Both are created once and shared by every session, so a turn
+# reuses the client's warm connection pool instead of paying for a new client,
+# prompt and parser (and a fresh TLS handshake) on every call.
+_llm_registry: dict[tuple[str, float], ChatGoogleGenerativeAI] = {}
+_chain_registry: dict[tuple[str, str, float], Runnable] = {}
+_chain_names: dict[int, str] = {}
+
+def get_llm(model: str, temperature: float) -> ChatGoogleGenerativeAI:
+    """Returns the shared chat client for this model and temperature."""
+    key = (model, temperature)
+    llm = _llm_registry.get(key)
+    if llm is None:
+        # Deterministic (temperature 0) clients share the response cache
+        cache = llm_cache if temperature == 0 and llm_cache is not None else None
+        # Retries are left to the governor (core/governor.py)
+        llm = ChatGoogleGenerativeAI(
+            model=model, temperature=temperature, cache=cache, max_retries=1,
+            callbacks=[llm_metrics_callback, timeline_callback],
+        )
+        _llm_registry[key] = llm
+    return llm
+
+def get_chain(name: str, model: str | None = None, temperature: float | None = None) -> Runnable:
+    """Returns the shared `prompt | llm [| parser]` chain for a prompt name."""
+    default_model, default_temperature = AGENT_MODELS[name]
+    model = model or default_model
+    temperature = default_temperature if temperature is None else temperature
+    key = (name, model, temperature)
+    chain = _chain_registry.get(key)
+    if chain is None:
+        prompt, parser = _PROMPTS[name]
+        chain = prompt | get_llm(model, temperature)
+        if parser is not None:
+            chain = chain | parser
+        _chain_registry[key] = chain
+        _chain_names[id(chain)] = name
+    return chain
+
+def init_llm_registry():
+    """Builds every default chain up front. Called once from the app lifespan."""
+    for name in _PROMPTS:
+        get_chain(name)
+        if MODEL_TIERING and name in TIERED_AGENTS:
+            get_chain(name, model=TIERED_AGENTS[name])
+    logging.info(f"LLM registry ready: {len(_llm_registry)} clients, {len(_chain_registry)} chains.")
+    logging.info(f"LLM response cache: {'enabled' if llm_cache is not None else 'disabled'}.")
+
+# --- Governed Calls ---
+# Async agents call the model through its governor (rate limits, concurrency
+# cap, retries, circuit breaker). The analysis agents fall back to a neutral
+# result when a call still fails, so a bad turn never ends the interview.
+FAILED_SENTIMENT = {"sentiment": "Unknown", "explanation": "The answer could not be analyzed."}
+# is_correct None marks the answer as unscored: a model outage must not count against the candidate
+FAILED_VERIFICATION = {"is_correct": None, "explanation": "The answer could not be analyzed.", "topic": "general", "confidence": 0.0}
+
+def _chain_llm(chain: Runnable) -> BaseChatModel | None:
+    for step in getattr(chain, "steps", [chain]):
+        if isinstance(step, BaseChatModel):
+            return step
+    return None
+
+def _chain_model(chain: Runnable) -> str:
+    llm = _chain_llm(chain)
+    return llm.model if llm is not None else GEMINI_MODEL
+
+async def _invoke_and_cache(chain: Runnable, inputs: dict, config: dict):
+    """Runs the chain; its responses enter the LLM cache only if the parser accepted them."""
+    with deferred_writes() as pending:
+        result = await chain.ainvoke(inputs, config)
+    if pending:
+        await llm_cache.flush_writes(pending)
+    return result
+
+async def _ainvoke(chain: Runnable, inputs: dict, priority: int):
+    model = _chain_model(chain)
+    labels = {"agent": _chain_names.get(id(chain), "unknown"), "model": model}
+    # The agent name labels the model request on the turn timeline (core/timeline.py)
+    config = {"metadata": {"agent": labels["agent"]}}
+    try:
+        with AGENT_LATENCY.time(**labels):
+            # A cached response needs no model slot or rate-limit budget: try the cache first
+            if getattr(_chain_llm(chain), "cache", None) is not None:
+                try:
+                    with cache_only():
+                        return await chain.ainvoke(inputs, config)
+                except CacheMiss:
+                    pass
+            return await get_governor(model).call(
+                lambda: _invoke_and_cache(chain, inputs, config), estimate_tokens(*inputs.values()), priority
+            )
+    except Exception:
+        ERRORS.inc(component="agent", **labels)
+        raise
+
+async def _astream(chain: Runnable, inputs: dict, priority: int):
+    model = _chain_model(chain)
+    labels = {"agent": _chain_names.get(id(chain), "unknown"), "model": model}
+    config = {"metadata": {"agent": labels["agent"]}}
+    try:
+        with AGENT_LATENCY.time(**labels):
+            async for chunk in get_governor(model).stream(lambda: chain.astream(inputs, config), estimate_tokens(*inputs.values()), priority):
+                yield chunk
+    except Exception:
+        ERRORS.inc(component="agent", **labels)
+        raise
+
+# --- Model Tiering ---
+# A tiered agent runs on its fast model first and escalates to its own model
+# (AGENT_MODELS) only when the input looks hard up front (a very long answer)
+# or the fast result is not good enough (e.g. a low-confidence verdict), or the
+# fast call fails. Escalation rate and latency are recorded per agent.
+_tier_stats: dict[str, dict] = {}
+
+def _record_tier(name: str, escalated: bool, fast_ms: float, strong_ms: float):
+    stats = _tier_stats.setdefault(name, {"calls": 0, "escalations": 0, "fast_calls": 0, "fast_ms": 0.0, "strong_calls": 0, "strong_ms": 0.0})
+    stats["calls"] += 1
+    stats["escalations"] += int(escalated)
+    if fast_ms:
+        stats["fast_calls"] += 1
+        stats["fast_ms"] += fast_ms
+    if strong_ms:
+        stats["strong_calls"] += 1
+        stats["strong_ms"] += strong_ms
+
+def tiering_stats() -> dict:
+    """Escalation rate and estimated latency saved (vs. always using the strong model) per tiered agent."""
+    report = {}
+    for name, stats in _tier_stats.items():
+        avg_strong_ms = stats["strong_ms"] / stats["strong_calls"] if stats["strong_calls"] else None
+        total_ms = stats["fast_ms"] + stats["strong_ms"]
+        report[name] = {
+            "calls": stats["calls"],
+            "escalation_rate": stats["escalations"] / stats["calls"],
+            "avg_fast_ms": round(stats["fast_ms"] / stats["fast_calls"]) if stats["fast_calls"] else None,
+            "avg_strong_ms": round(avg_strong_ms) if avg_strong_ms is not None else None,
+            "latency_saved_ms": round(stats["calls"] * avg_strong_ms - total_ms) if avg_strong_ms is not None else None,
+        }
+    return report
+
+async def _tiered_ainvoke(name: str, inputs: dict, priority: int, escalate_before=None, escalate_after=None):
+    """Invokes a tiered agent's chain. `escalate_before(inputs)` and `escalate_after(result)`
+    return a reason to escalate, or None."""
+    if not (MODEL_TIERING and name in TIERED_AGENTS):
+        # Not tiered: the agent's own model, with no escalation to log or count
+        return await _ainvoke(get_chain(name), inputs, priority)
+    fast_ms = 0.0
+    reason = escalate_before(inputs) if escalate_before else None
+    if reason is None:
+        started = time.perf_counter()
+        try:
+            result = await _ainvoke(get_chain(name, model=TIERED_AGENTS[name]), inputs, priority)
+            reason = escalate_after(result) if escalate_after else None
+        except Exception as e:
+            reason = f"fast model failed ({e})"
+        fast_ms = (time.perf_counter() - started) * 1000
+        if reason is None:
+            _record_tier(name, False, fast_ms, 0.0)
+            return result
+    logging.info(f"---TIERING: {name} escalated to {AGENT_MODELS[name][0]}: {reason}---")
+    started = time.perf_counter()
+    try:
+        return await _ainvoke(get_chain(name), inputs, priority)
+    finally:
+        _record_tier(name, True, fast_ms, (time.perf_counter() - started) * 1000)
+
+def _long_answer(inputs: dict) -> str | None:
+    if len(inputs["answer"]) > ESCALATION_ANSWER_CHARS:
+        return f"long answer ({len(inputs['answer'])} chars)"
+    return None
+
+def _low_confidence(verification: AnswerVerification) -> str | None:
+    if verification.confidence < ESCALATION_MIN_CONFIDENCE:
+        return f"low confidence ({verification.confidence:.2f})"
+    return None
+
+def _thin_narrative(narrative: ReportNarrative) -> str | None:
+    if not narrative.overall_summary.strip() or not narrative.points_for_improvement:
+        return "incomplete narrative"
+    return None
+
+# --- Compact Prompt Context ---
+# Prompts never see the raw conversation: the job context is rendered as a few
+# lines, turns older than SUMMARY_RECENT_TURNS live in `conversation_summary`,
+# and only the turns after `summarized_turns` are included verbatim.
+
+def format_job_context(summary: dict) -> str:
+    return (
+        f"Candidate: {summary.get('candidate_name', '')}\n"
+        f"Role: {summary.get('role_title', '')} ({summary.get('experience_level', '')})\n"
+        f"Fit: {summary.get('candidate_fit_summary', '')}"
     )
-    llm = ChatGoogleGenerativeAI(model=GEMINI_MODEL, temperature=0)
-    chain = prompt | llm | parser
-    summary = chain.invoke({
+
+def format_exchanges(state: dict, start: int, end: int, with_verdicts: bool = False) -> str:
+    """Renders turns [start, end) of the conversation, optionally with the verifier's verdicts."""
+    history = state.get("conversation_history", [])
+    verifications = state.get("verifications", [])
+    lines = []
+    for i in range(start, min(end, len(history))):
+        lines.append(f"Q{i + 1}: {history[i]['question']}\nA{i + 1}: {history[i]['answer']}")
+        if with_verdicts and i < len(verifications):
+            is_correct = verifications[i].get("is_correct")
+            verdict = "not assessed" if is_correct is None else "correct" if is_correct else "incorrect"
+            lines.append(f"Verdict: {verdict} - {verifications[i].get('explanation', '')}")
+    return "\n".join(lines)
+
+def needs_summary(state: dict) -> bool:
+    """True when more than SUMMARY_RECENT_TURNS turns are not yet in the rolling summary."""
+    return len(state.get("conversation_history", [])) - state.get("summarized_turns", 0) > SUMMARY_RECENT_TURNS
+
+# --- Agent Inputs ---
+# Each agent is split into a helper that picks the shared chain and builds its
+# inputs, plus thin sync/async wrappers, so the WebSocket route can await the
+# native `ainvoke` instead of blocking the event loop with `invoke`.
+
+def _context_analyzer_chain(state: dict):
+    inputs = {
         "job_description": state["job_description"],
         "resume_text": state["resume_text"],
-        "format_instructions": parser.get_format_instructions()
-    })
-    return {"job_context_summary": summary.dict()}
+    }
+    return get_chain("context_analyzer"), inputs
 
-def interviewer_agent(state: dict) -> dict:
-    """Generates questions tailored to the job description and conversation flow."""
-    logging.info("---AGENT: Interviewer---")
-    system_prompt = (
-        "You are 'Akshay', a professional and insightful AI technical interviewer. Your goal is to assess the candidate for a specific role. "
-        "Your questions must be targeted and relevant to the job description and the candidate's projects. "
-        "Adjust the complexity of your questions based on the required experience level for the role. Ask only one question at a time. Do not use phrases like 'we are running out of time'.\n\n"
-        "JOB CONTEXT:\n{job_context}"
-    )
+def _interviewer_chain(state: dict):
     if not state["conversation_history"]:
-        human_prompt_template = "Start the interview by greeting {candidate_name}. Thank them for applying and then ask them to briefly introduce themselves."
+        name = "interviewer_greeting"
         input_vars = {"candidate_name": state['job_context_summary']['candidate_name']}
     else:
+        name = "interviewer_follow_up"
         last_exchange = state["conversation_history"][-1]
-        human_prompt_template = "The last question was: '{question}'. The candidate's answer was: '{answer}'. Now, ask a relevant follow-up question based on their answer or pivot to a new topic from their resume or the job description."
         input_vars = {"question": last_exchange['question'], "answer": last_exchange['answer']}
-
-    prompt = ChatPromptTemplate.from_messages([("system", system_prompt), ("human", human_prompt_template)])
-    llm = ChatGoogleGenerativeAI(model=GEMINI_MODEL, temperature=0.8)
-    chain = prompt | llm
-    
+        # Earlier turns: the rolling summary plus anything not yet folded into it
+        earlier = format_exchanges(state, state.get("summarized_turns", 0), len(state["conversation_history"]) - 1)
+        input_vars["interview_so_far"] = "\n\n".join(
+            part for part in (state.get("conversation_summary", ""), earlier) if part
+        ) or "(This was the first question.)"
     # Pass all necessary variables to the invoke method
-    response = chain.invoke({**input_vars, "job_context": state['job_context_summary']})
+    return get_chain(name), {**input_vars, "job_context": format_job_context(state['job_context_summary'])}
+
+def _sentiment_analyzer_chain(state: dict):
+    return get_chain("sentiment_analyzer"), {"answer": state["candidate_answer"]}
+
+def _verifier_chain(state: dict):
+    return get_chain("verifier"), {"question": state["current_question"], "answer": state["candidate_answer"]}
+
+def _assessor_chain(state: dict):
+    return get_chain("answer_assessor"), {"question": state["current_question"], "answer": state["candidate_answer"]}
+
+def _final_scorer_chain(state: dict):
+    inputs = {
+        "scorecard": format_scorecard(state.get("scorecard") or new_scorecard()),
+        "conversation_summary": state.get("conversation_summary") or "(none)",
+        "recent_exchanges": format_exchanges(state, state.get("summarized_turns", 0), len(state["conversation_history"])),
+        "job_context": format_job_context(state["job_context_summary"]),
+    }
+    return get_chain("final_scorer"), inputs
+
+def _final_report(state: dict, narrative: ReportNarrative) -> dict:
+    scorecard = state.get("scorecard") or new_scorecard()
+    report = FinalReport(
+        **narrative.dict(),
+        total_questions_asked=scorecard["questions_asked"],
+        total_correct_answers=scorecard["correct_answers"],
+        unscored_answers=scorecard.get("unscored", 0),
+        final_score=score(scorecard),
+        topic_breakdown=scorecard["topics"],
+        sentiment_trend=scorecard["sentiment_trend"],
+    )
+    return report.dict()
+
+def _summarizer_chain(state: dict):
+    start = state.get("summarized_turns", 0)
+    end = len(state["conversation_history"]) - SUMMARY_RECENT_TURNS
+    inputs = {
+        "summary": state.get("conversation_summary") or "(empty)",
+        "exchanges": format_exchanges(state, start, end, with_verdicts=True),
+    }
+    return get_chain("conversation_summarizer"), inputs, end
+
+# --- Agent Functions ---
+
+def context_analyzer_agent(state: dict) -> dict:
+    """Analyzes the resume, company, and job description to create a holistic summary."""
+    logging.info("---AGENT: Context Analyzer---")
+    chain, inputs = _context_analyzer_chain(state)
+    summary = chain.invoke(inputs)
+    return {"job_context_summary": summary.dict()}
+
+async def acontext_analyzer_agent(state: dict) -> dict:
+    """Async variant of `context_analyzer_agent`."""
+    logging.info("---AGENT: Context Analyzer---")
+    chain, inputs = _context_analyzer_chain(state)
+    summary = await _ainvoke(chain, inputs, INTERACTIVE)
+    return {"job_context_summary": summary.dict()}
+
+def interviewer_agent(state: dict) -> dict:
+    """Generates questions tailored to the job description and conversation flow."""
+    logging.info("---AGENT: Interviewer---")
+    chain, inputs = _interviewer_chain(state)
+    response = chain.invoke(inputs)
+    return {"current_question": response.content}
+
+async def ainterviewer_agent(state: dict) -> dict:
+    """Async variant of `interviewer_agent`."""
+    logging.info("---AGENT: Interviewer---")
+    chain, inputs = _interviewer_chain(state)
+    response = await _ainvoke(chain, inputs, INTERACTIVE)
     return {"current_question": response.content}
 
+async def astream_interviewer_agent(state: dict):
+    """Streaming variant of `interviewer_agent`: yields the question as text deltas."""
+    logging.info("---AGENT: Interviewer (streaming)---")
+    chain, inputs = _interviewer_chain(state)
+    async for chunk in _astream(chain, inputs, INTERACTIVE):
+        if chunk.content:
+            yield chunk.content
+
+# Shadow LLM calls that check the local classifier; references kept until done
+_shadow_tasks: set[asyncio.Task] = set()
+
+async def _shadow_compare(inputs: dict, local: dict):
+    try:
+        analysis = await _ainvoke(get_chain("sentiment_analyzer"), inputs, BACKGROUND)
+    except Exception as e:
+        logging.warning(f"Sentiment shadow comparison failed: {e}")
+        return
+    if not record_comparison(local, analysis.dict()):
+        logging.info(f"Sentiment mismatch: local={local['sentiment']} llm={analysis.sentiment}")
 
 def sentiment_analyzer_agent(state: dict) -> dict:
     """Analyzes the sentiment of the candidate's most recent answer."""
-    logging.info(f"---AGENT: Sentiment Analyzer---")
-    parser = PydanticOutputParser(pydantic_object=SentimentAnalysis)
-    prompt = ChatPromptTemplate.from_template(
-        "Analyze the sentiment of the candidate's answer. Consider their tone, confidence, and attitude. Provide the sentiment and a brief explanation.\n{format_instructions}\n\nCandidate's Answer: {answer}"
-    )
-    llm = ChatGoogleGenerativeAI(model=GEMINI_MODEL, temperature=0)
-    chain = prompt | llm | parser
-    analysis = chain.invoke({"answer": state["candidate_answer"], "format_instructions": parser.get_format_instructions()})
-    return {"sentiment_analyses": state.get("sentiment_analyses", []) + [analysis.dict()]}
+    logging.info(f"---AGENT: Sentiment Analyzer ({SENTIMENT_BACKEND})---")
+    if SENTIMENT_BACKEND == "local":
+        analysis = classify_sentiment(state["candidate_answer"])
+    else:
+        chain, inputs = _sentiment_analyzer_chain(state)
+        analysis = chain.invoke(inputs).dict()
+    return {"sentiment_analyses": state.get("sentiment_analyses", []) + [analysis]}
+
+async def asentiment_analyzer_agent(state: dict) -> dict:
+    """Async variant of `sentiment_analyzer_agent`."""
+    logging.info(f"---AGENT: Sentiment Analyzer ({SENTIMENT_BACKEND})---")
+    chain, inputs = _sentiment_analyzer_chain(state)
+    if SENTIMENT_BACKEND == "local":
+        analysis = classify_sentiment(state["candidate_answer"])
+        if random.random() < SENTIMENT_SHADOW_RATE:
+            task = asyncio.create_task(_shadow_compare(inputs, analysis))
+            _shadow_tasks.add(task)
+            task.add_done_callback(_shadow_tasks.discard)
+    else:
+        try:
+            analysis = (await _ainvoke(chain, inputs, ANALYSIS)).dict()
+        except Exception as e:
+            logging.error(f"Sentiment analysis failed: {e}")
+            analysis = FAILED_SENTIMENT
+    return {"sentiment_analyses": state.get("sentiment_analyses", []) + [analysis]}
 
 def verifier_agent(state: dict) -> dict:
     """The Fact-Checker: Verifies the technical correctness of the answer."""
     logging.info(f"---AGENT: Verifier (Fact-Checker)---")
-    parser = PydanticOutputParser(pydantic_object=AnswerVerification)
-    prompt = ChatPromptTemplate.from_template("Is the following answer technically correct? Respond with a boolean and a brief explanation.\n{format_instructions}\n\nQuestion: {question}\nCandidate's Answer: {answer}")
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro", temperature=0)
-    chain = prompt | llm | parser
-    verification = chain.invoke({"question": state["current_question"], "answer": state["candidate_answer"], "format_instructions": parser.get_format_instructions()})
+    chain, inputs = _verifier_chain(state)
+    verification = chain.invoke(inputs)
     return {"verifications": state.get("verifications", []) + [verification.dict()]}
 
+async def averifier_agent(state: dict) -> dict:
+    """Async variant of `verifier_agent`."""
+    logging.info(f"---AGENT: Verifier (Fact-Checker)---")
+    _, inputs = _verifier_chain(state)
+    try:
+        verification = (await _tiered_ainvoke(
+            "verifier", inputs, ANALYSIS, _long_answer, _low_confidence
+        )).dict()
+    except Exception as e:
+        logging.error(f"Verification failed: {e}")
+        verification = FAILED_VERIFICATION
+    return {"verifications": state.get("verifications", []) + [verification]}
+
+def _assessment_update(state: dict, sentiment: dict, verification: dict) -> dict:
+    return {
+        "sentiment_analyses": state.get("sentiment_analyses", []) + [sentiment],
+        "verifications": state.get("verifications", []) + [verification],
+    }
+
+def assessor_agent(state: dict) -> dict:
+    """Sentiment analysis and verification of the latest answer in a single call."""
+    logging.info("---AGENT: Answer Assessor---")
+    chain, inputs = _assessor_chain(state)
+    assessment = chain.invoke(inputs)
+    return _assessment_update(state, assessment.sentiment.dict(), assessment.verification.dict())
+
+async def aassessor_agent(state: dict) -> dict:
+    """Async variant of `assessor_agent`."""
+    logging.info("---AGENT: Answer Assessor---")
+    _, inputs = _assessor_chain(state)
+    try:
+        assessment = await _tiered_ainvoke(
+            "answer_assessor", inputs, ANALYSIS, _long_answer, lambda a: _low_confidence(a.verification)
+        )
+    except Exception as e:
+        logging.error(f"Answer assessment failed: {e}")
+        return _assessment_update(state, FAILED_SENTIMENT, FAILED_VERIFICATION)
+    return _assessment_update(state, assessment.sentiment.dict(), assessment.verification.dict())
+
 def final_scorer_agent(state: dict) -> dict:
     """Generates the final, detailed report."""
     logging.info("---AGENT: Final Scorer---")
-    parser = PydanticOutputParser(pydantic_object=FinalReport)
-    prompt = ChatPromptTemplate.from_template(
-        "You are the lead hiring manager. Review the entire interview to provide a final, detailed report. "
-        "Your report must include the total number of questions asked, the number of correct answers, a concise overall summary, specific points for improvement, and a final score out of 100.\n{format_instructions}\n\n"
-        "JOB CONTEXT:\n{job_context}\n\n"
-        "CONVERSATION HISTORY:\n{conversation_history}\n\n"
-        "TECHNICAL VERIFICATIONS:\n{verifications}"
-    )
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro", temperature=0.2)
-    chain = prompt | llm | parser
-    report = chain.invoke({
-        "conversation_history": state["conversation_history"],
-        "verifications": state["verifications"],
-        "job_context": state["job_context_summary"],
-        "format_instructions": parser.get_format_instructions()
-    })
-    return {"final_report": report.dict()}
+    chain, inputs = _final_scorer_chain(state)
+    narrative = chain.invoke(inputs)
+    return {"final_report": _final_report(state, narrative)}
+
+async def afinal_scorer_agent(state: dict) -> dict:
+    """Async variant of `final_scorer_agent`."""
+    logging.info("---AGENT: Final Scorer---")
+    _, inputs = _final_scorer_chain(state)
+    try:
+        narrative = await _tiered_ainvoke("final_scorer", inputs, REPORT, escalate_after=_thin_narrative)
+    except Exception as e:
+        # The counters come from the scorecard, so the report is still useful
+        logging.error(f"Final report narrative failed: {e}")
+        narrative = ReportNarrative(overall_summary="The written summary could not be generated for this interview.", points_for_improvement=[])
+    return {"final_report": _final_report(state, narrative)}
+
+async def asummarizer_agent(state: dict) -> dict:
+    """Folds the turns that left the recent window into the rolling conversation summary."""
+    logging.info("---AGENT: Conversation Summarizer---")
+    chain, inputs, summarized_turns = _summarizer_chain(state)
+    try:
+        response = await _ainvoke(chain, inputs, ANALYSIS)
+    except Exception as e:
+        # Keep the old summary; the same turns are folded in on the next try
+        logging.error(f"Conversation summary failed: {e}")
+        return {}
+    return {"conversation_summary": response.content.strip(), "summarized_turns": summarized_turns}
 
 def router_agent(state: dict) -> str:
     """Decides whether to continue the interview or end it."""
     logging.info(f"---ROUTER: {len(state.get('conversation_history', []))} questions asked.---")
-    if "end the interview" in state.get("candidate_answer", "").lower() or len(state.get("conversation_history", [])) >= 5:
+    if "end the interview" in state.get("candidate_answer", "").lower() or len(state.get("conversation_history", [])) >= INTERVIEW_MAX_QUESTIONS:
         return "end_interview"
     return "continue_interview"
\ No newline at end of file
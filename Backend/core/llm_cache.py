@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from core.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MEMORY_ENTRIES,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+)
+
+# --- LLM Response Cache ---
+# Temperature-0 agents (context analysis, sentiment, verification, combined
+# assessment) answer identical prompts identically, and many prompts repeat
+# across candidates (the intro answer, standard definitions). Responses are
+# cached under sha256(model settings + rendered prompt) in two tiers: an
+# in-process LRU, backed by a SQLite file shared by all workers, with TTL and
+# size eviction. Only LLMs created with `cache=llm_cache` use it.
+# Inside `deferred_writes()` responses are only stored once the caller has
+# parsed them (`flush_writes`), so an unparseable response is never replayed.
+# Inside `cache_only()` a miss raises CacheMiss instead of calling the model, so
+# callers can answer from the cache before taking a rate-limited model slot.
+_PRUNE_EVERY_WRITES = 100
+
+_pending_writes: ContextVar[list | None] = ContextVar("llm_cache_pending_writes", default=None)
+_cache_only: ContextVar[bool] = ContextVar("llm_cache_only", default=False)
+
+class CacheMiss(Exception):
+    """Raised by a lookup inside `cache_only()` when the response is not cached."""
+
+@contextmanager
+def cache_only():
+    """Makes the enclosed model calls answer from the cache or raise CacheMiss."""
+    token = _cache_only.set(True)
+    try:
+        yield
+    finally:
+        _cache_only.reset(token)
+
+@contextmanager
+def deferred_writes():
+    """Collects the cache writes of the enclosed calls instead of storing them; yields the list."""
+    pending = []
+    token = _pending_writes.set(pending)
+    try:
+        yield pending
+    finally:
+        _pending_writes.reset(token)
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+def _dump_generations(generations: list[Generation]) -> str:
+    return json.dumps([
+        {"message": message_to_dict(g.message)} if isinstance(g, ChatGeneration) else {"text": g.text}
+        for g in generations
+    ])
+
+def _as_cached(generations: list[Generation]) -> list[Generation]:
+    """Copies handed to LangChain, marked so metrics can tell replayed responses apart."""
+    return [g.model_copy(update={"generation_info": {**(g.generation_info or {}), "cached": True}}) for g in generations]
+
+def _load_generations(payload: str) -> list[Generation]:
+    return [
+        ChatGeneration(message=messages_from_dict([item["message"]])[0]) if "message" in item else Generation(text=item["text"])
+        for item in json.loads(payload)
+    ]
+
+class TieredLLMCache(BaseCache):
+    """LangChain cache with an in-memory LRU tier in front of a persistent SQLite tier."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+                 ttl_seconds: int = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, tuple[float, list[Generation]]] = OrderedDict()
+        # The memory tier is used from the event loop and from to_thread workers
+        self._memory_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._writes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    # --- SQLite tier ---
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_created_at ON llm_cache (created_at)")
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, key: str) -> tuple[float, list[Generation]] | None:
+        with self._lock:
+            row = self._db().execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[1], _load_generations(row[0])
+
+    def _disk_put(self, key: str, generations: list[Generation], created_at: float):
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+                (key, _dump_generations(generations), created_at),
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY_WRITES == 0:
+                self._prune(db)
+            db.commit()
+
+    def _prune(self, db: sqlite3.Connection):
+        """Drops expired rows, then the oldest rows beyond `max_entries`."""
+        db.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    # --- Memory tier ---
+    def _remember(self, key: str, created_at: float, generations: list[Generation]):
+        with self._memory_lock:
+            self._memory[key] = (created_at, generations)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _fresh(self, created_at: float) -> bool:
+        return time.time() - created_at < self.ttl_seconds
+
+    def _memory_get(self, key: str) -> list[Generation] | None:
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None or not self._fresh(entry[0]):
+                return None
+            self._memory.move_to_end(key)
+        self.stats["memory_hits"] += 1
+        return _as_cached(entry[1])
+
+    def _lookup(self, key: str, count_miss: bool = True) -> list[Generation] | None:
+        cached = self._memory_get(key)
+        if cached is not None:
+            return cached
+        try:
+            entry = self._disk_get(key)
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache read failed: {e}")
+            entry = None
+        if entry is not None and self._fresh(entry[0]):
+            self._remember(key, *entry)
+            self.stats["disk_hits"] += 1
+            return _as_cached(entry[1])
+        if count_miss:
+            self.stats["misses"] += 1
+        return None
+
+    # --- BaseCache interface ---
+    def lookup(self, prompt: str, llm_string: str) -> list[Generation] | None:
+        return self._lookup(cache_key(prompt, llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val: list[Generation]) -> None:
+        key = cache_key(prompt, llm_string)
+        created_at = time.time()
+        self._remember(key, created_at, return_val)
+        self.stats["writes"] += 1
+        try:
+            self._disk_put(key, return_val, created_at)
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache write failed: {e}")
+
+    def clear(self, **kwargs) -> None:
+        with self._memory_lock:
+            self._memory.clear()
+        with self._lock:
+            self._db().execute("DELETE FROM llm_cache")
+            self._db().commit()
+
+    # Memory hits are answered on the event loop; only the SQLite tier uses a thread
+    async def alookup(self, prompt: str, llm_string: str) -> list[Generation] | None:
+        key = cache_key(prompt, llm_string)
+        cached = self._memory_get(key)
+        if cached is not None:
+            return cached
+        # A cache-only miss is counted by the real call that follows it
+        probing = _cache_only.get()
+        cached = await asyncio.to_thread(self._lookup, key, not probing)
+        if cached is None and probing:
+            raise CacheMiss()
+        return cached
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: list[Generation]) -> None:
+        pending = _pending_writes.get()
+        if pending is not None:
+            pending.append((prompt, llm_string, return_val))
+            return
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    async def flush_writes(self, pending: list):
+        """Stores the writes collected by `deferred_writes()`."""
+        for prompt, llm_string, return_val in pending:
+            await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs) -> None:
+        await asyncio.to_thread(self.clear)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the shared cache (all zero when it is disabled)."""
+    if llm_cache is None:
+        return {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+    return dict(llm_cache.stats)
+
+llm_cache = TieredLLMCache() if LLM_CACHE_ENABLED else None
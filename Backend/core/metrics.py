@@ -0,0 +1,249 @@
+import asyncio
+import bisect
+import glob
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from core.config import METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS
+from core.llm_cache import CacheMiss
+
+# --- Metrics ---
+# A small in-process registry rendered in the Prometheus text format at
+# /metrics. Recording is a dict lookup plus an addition (a bisect for
+# histograms) on the event loop thread, so instrumentation stays off the
+# latency budget. Counters kept by other modules (LLM cache, governor,
+# tiering, sentiment comparison) are read through collectors at scrape time.
+#
+# With several server workers each one keeps its own registry, so a scrape
+# would only see the worker that answered it. When METRICS_MULTIPROC_DIR is set
+# (main.py sets it for multi-worker runs), every worker writes a snapshot of its
+# metrics there every METRICS_FLUSH_SECONDS and when scraped, and /metrics
+# merges the snapshots of all workers: counters and histograms are summed,
+# including those of workers that have exited so totals never go down; gauges
+# are reported per live worker with a `worker` label.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DB_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, key, value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self.values[_label_key(labels)] = value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # label key -> [per-bucket counts (+Inf last), sum]
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        for key, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", key + (("le", _format_value(float(bound))),), cumulative
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, cumulative
+
+_metrics: list = []
+_collectors: list[Callable[[], list[tuple]]] = []
+
+def _register(metric):
+    _metrics.append(metric)
+    return metric
+
+def register_collector(collect: Callable[[], list[tuple]]):
+    """`collect()` returns (name, kind, help, [(labels dict, value), ...]) tuples, read at scrape time."""
+    _collectors.append(collect)
+
+def _families() -> list[tuple]:
+    """This worker's metrics as (name, kind, help, [(sample name, label key, value), ...]) tuples."""
+    families = [(m.name, m.kind, m.help, list(m.samples())) for m in _metrics]
+    for collect in _collectors:
+        for name, kind, help, values in collect():
+            families.append((name, kind, help, [(name, _label_key(labels), value) for labels, value in values]))
+    return families
+
+# --- Multiple Workers ---
+_SNAPSHOT_NAME = f"{os.getpid()}-{time.time_ns()}"
+_snapshot_task: asyncio.Task | None = None
+
+def write_snapshot():
+    """Writes this worker's metrics to the shared directory (no-op when it is not set)."""
+    if not METRICS_MULTIPROC_DIR:
+        return
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"{_SNAPSHOT_NAME}.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"written": time.time(), "families": _families()}, f)
+    # Readers only ever see complete snapshots
+    os.replace(f"{path}.tmp", path)
+
+def _merged_families() -> list[tuple]:
+    write_snapshot()
+    # A worker that stopped writing has exited: its gauges no longer describe anything
+    live_after = time.time() - 3 * METRICS_FLUSH_SECONDS
+    merged: dict[str, tuple] = {}
+    for path in sorted(glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json"))):
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        worker = os.path.basename(path).split("-", 1)[0]
+        live = snapshot["written"] >= live_after
+        for name, kind, help, samples in snapshot["families"]:
+            values = merged.setdefault(name, (kind, help, {}))[2]
+            if kind == "gauge" and not live:
+                continue
+            for sample_name, key, value in samples:
+                key = tuple(tuple(pair) for pair in key)
+                if kind == "gauge":
+                    key += (("worker", worker),)
+                values[sample_name, key] = values.get((sample_name, key), 0) + value
+    return [
+        (name, kind, help, [(sample_name, key, value) for (sample_name, key), value in values.items()])
+        for name, (kind, help, values) in merged.items()
+    ]
+
+async def _write_snapshots():
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            write_snapshot()
+        except OSError as e:
+            logging.warning(f"Could not write the metrics snapshot: {e}")
+
+def start_snapshots():
+    """Starts writing this worker's snapshots periodically (multi-worker runs only)."""
+    global _snapshot_task
+    if METRICS_MULTIPROC_DIR and _snapshot_task is None:
+        _snapshot_task = asyncio.create_task(_write_snapshots())
+
+async def stop_snapshots():
+    """Stops the periodic writer and writes a last snapshot so no count is lost."""
+    global _snapshot_task
+    if _snapshot_task is not None:
+        _snapshot_task.cancel()
+        try:
+            await _snapshot_task
+        except asyncio.CancelledError:
+            pass
+        _snapshot_task = None
+        write_snapshot()
+
+def render() -> str:
+    """All metrics (of every worker, in multi-worker runs) in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, kind, help, samples in (_merged_families() if METRICS_MULTIPROC_DIR else _families()):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample_name, key, value in samples:
+            lines.append(f"{sample_name}{_format_labels(key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+# --- Application Metrics ---
+AGENT_LATENCY = _register(Histogram("interviewai_agent_latency_seconds", "Agent call latency, including queueing and retries."))
+LLM_LATENCY = _register(Histogram("interviewai_llm_request_latency_seconds", "Latency of individual model requests."))
+LLM_TOKENS = _register(Counter("interviewai_llm_tokens_total", "Tokens used by model requests (cache hits excluded)."))
+AUDIO_LATENCY = _register(Histogram("interviewai_audio_latency_seconds", "Text-to-speech and speech-to-text latency."))
+PDF_EXTRACTION_LATENCY = _register(Histogram("interviewai_pdf_extraction_seconds", "Resume PDF extraction latency."))
+DB_COMMIT_LATENCY = _register(Histogram("interviewai_db_commit_seconds", "Database commit latency.", DB_BUCKETS))
+ACTIVE_SESSIONS = _register(Gauge("interviewai_active_websocket_sessions", "Open interview WebSocket connections."))
+ERRORS = _register(Counter("interviewai_errors_total", "Errors by component."))
+
+class LLMMetricsCallback(AsyncCallbackHandler):
+    """Times each model request and counts its tokens. Attached to every shared chat client."""
+
+    def __init__(self):
+        self._started: dict[UUID, tuple[float, str]] = {}
+
+    async def on_chat_model_start(self, serialized: dict[str, Any], messages, *, run_id: UUID, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model") or (kwargs.get("metadata") or {}).get("ls_model_name", "unknown")
+        self._started[run_id] = (time.perf_counter(), str(model).removeprefix("models/"))
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        began, model = started
+        cached = False
+        for generations in response.generations:
+            for generation in generations:
+                if (generation.generation_info or {}).get("cached"):
+                    cached = True
+                    continue
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                if usage.get("input_tokens"):
+                    LLM_TOKENS.inc(usage["input_tokens"], model=model, type="input")
+                if usage.get("output_tokens"):
+                    LLM_TOKENS.inc(usage["output_tokens"], model=model, type="output")
+        LLM_LATENCY.observe(time.perf_counter() - began, model=model, cached=str(cached).lower())
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        # A cache-only lookup that missed made no request
+        if not isinstance(error, CacheMiss):
+            ERRORS.inc(component="llm", model=started[1] if started else "unknown")
+
+llm_metrics_callback = LLMMetricsCallback()
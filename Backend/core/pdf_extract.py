@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz # PyMuPDF
+from fastapi import UploadFile
+
+from core.config import PDF_WORKERS, PDF_PAGES_PER_TASK, PDF_TIMEOUT_SECONDS, MAX_UPLOAD_BYTES
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+class UploadTooLargeError(Exception):
+    pass
+
+class PDFExtractionTimeout(Exception):
+    pass
+
+# --- Process Pool ---
+# PyMuPDF parsing is CPU-bound and holds the GIL, so it runs in worker
+# processes; the event loop only awaits the results. When a document times
+# out, its pool is retired: new uploads go to a fresh pool, and the old one
+# (with the stuck worker) is killed once its other extractions have finished.
+_executor: ProcessPoolExecutor | None = None
+_in_flight: dict[ProcessPoolExecutor, int] = {}
+_retired: dict[ProcessPoolExecutor, asyncio.Task] = {}
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _executor
+
+def _kill(executor: ProcessPoolExecutor):
+    # ProcessPoolExecutor has no public way to stop a running task
+    for process in list(getattr(executor, "_processes", {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+async def _retire(executor: ProcessPoolExecutor):
+    """Kills a pool with a stuck worker once its other extractions are done.
+
+    Each extraction is bounded by its own timeout, so this wait is too.
+    """
+    while _in_flight.get(executor, 0) > 0:
+        await asyncio.sleep(0.1)
+    _retired.pop(executor, None)
+    _in_flight.pop(executor, None)
+    _kill(executor)
+
+def shutdown_executor():
+    """Shuts the pool down, killing any retired pool still waiting to be recycled."""
+    global _executor
+    executor, _executor = _executor, None
+    for retired, task in list(_retired.items()):
+        task.cancel()
+        _kill(retired)
+    _retired.clear()
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+# --- Worker Functions (run in the pool) ---
+def _page_count(path: str) -> int:
+    with fitz.open(path) as document:
+        return document.page_count
+
+def _extract_pages(path: str, start: int, stop: int) -> str:
+    with fitz.open(path) as document:
+        return "".join(document[number].get_text() for number in range(start, stop))
+
+# --- Public API ---
+# The request body is size-limited before it is parsed (see routes/pdf.py) and
+# Starlette has already spooled the file, so it is hashed in place; it is only
+# written to a named file (which the pool's processes can open) when it has to
+# be extracted, i.e. not for a repeat upload.
+def _hash_file(source, max_bytes: int) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    while chunk := source.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds {max_bytes // (1024 * 1024)} MB.")
+        digest.update(chunk)
+    source.seek(0)
+    return digest.hexdigest(), size
+
+async def hash_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> tuple[str, int]:
+    """Returns (sha256 hex digest, size in bytes) of an upload, read from Starlette's spooled file."""
+    return await asyncio.to_thread(_hash_file, file.file, max_bytes)
+
+def _copy_to_named_file(source) -> str:
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as named:
+        shutil.copyfileobj(source, named, UPLOAD_CHUNK_BYTES)
+    return named.name
+
+@asynccontextmanager
+async def upload_path(file: UploadFile):
+    """Yields a path to the upload's contents for the extraction processes; deleted afterwards."""
+    path = await asyncio.to_thread(_copy_to_named_file, file.file)
+    try:
+        yield path
+    finally:
+        os.unlink(path)
+
+async def _extract(path: str, executor: ProcessPoolExecutor) -> str:
+    loop = asyncio.get_running_loop()
+    page_count = await loop.run_in_executor(executor, _page_count, path)
+    ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count)) for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+    parts = await asyncio.gather(*(loop.run_in_executor(executor, _extract_pages, path, start, stop) for start, stop in ranges))
+    return "".join(parts)
+
+async def extract_pdf_text(path: str, timeout: float = PDF_TIMEOUT_SECONDS) -> str:
+    """Extracts the text of a PDF on disk, page ranges in parallel, within `timeout` seconds."""
+    global _executor
+    executor = get_executor()
+    _in_flight[executor] = _in_flight.get(executor, 0) + 1
+    try:
+        return await asyncio.wait_for(_extract(path, executor), timeout)
+    except asyncio.TimeoutError:
+        if executor is _executor:
+            logging.warning(f"PDF extraction timed out after {timeout}s; recycling the PDF worker pool.")
+            _executor = None
+            _retired[executor] = asyncio.create_task(_retire(executor))
+        raise PDFExtractionTimeout(f"PDF could not be processed within {timeout:g} seconds.")
+    finally:
+        if executor in _in_flight:
+            _in_flight[executor] -= 1
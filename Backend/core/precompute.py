@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+from core.context import get_context_summary
+from core.llm import ainterviewer_agent
+from core.resume_store import load_resume
+from core.session_store import session_store
+from core.scheduler import BACKGROUND, current_interview, priority_scope, promoted
+
+# --- Upload-time Precompute ---
+# Right after a PDF upload, the context summary and the opening question are
+# generated in the background while the candidate navigates to the interview
+# page. The WebSocket handler then picks up the finished result (from the
+# session store, or by awaiting the in-flight task on this worker) instead of
+# starting two LLM calls from zero.
+PRECOMPUTE_TTL_SECONDS = 15 * 60
+_pending: dict[int, asyncio.Task] = {}
+
+async def _precompute(interview_id: int) -> dict | None:
+    resume = await load_resume(interview_id)
+    if not resume:
+        return None
+    # Speculative work: live turns of other interviews go first
+    current_interview.set(interview_id)
+    with priority_scope(BACKGROUND):
+        summary = await get_context_summary(resume)
+        question_update = await ainterviewer_agent({"conversation_history": [], "job_context_summary": summary})
+    initial_state = {
+        "conversation_history": [],
+        "verifications": [],
+        "sentiment_analyses": [],
+        "job_context_summary": summary,
+        **question_update,
+    }
+    # Publish it as the session's starting point, so a WebSocket that lands on
+    # another worker picks it up too (with a shared session store)
+    if await session_store.get(interview_id) is None:
+        await session_store.put(interview_id, initial_state)
+    return initial_state
+
+def _expire(interview_id: int, task: asyncio.Task):
+    if _pending.get(interview_id) is task:
+        del _pending[interview_id]
+
+def schedule_precompute(interview_id: int):
+    """Starts the precompute for an interview. Must be called from the event loop."""
+    task = asyncio.create_task(_precompute(interview_id))
+    _pending[interview_id] = task
+    # Drop results nobody picked up so abandoned uploads don't pile up in memory
+    task.add_done_callback(
+        lambda t: asyncio.get_running_loop().call_later(PRECOMPUTE_TTL_SECONDS, _expire, interview_id, t)
+    )
+
+async def take_precomputed(interview_id: int) -> dict | None:
+    """Returns the precomputed state for an interview (awaiting it if still running), or None."""
+    task = _pending.pop(interview_id, None)
+    if task is None:
+        return None
+    try:
+        # The candidate is waiting on it now: stop treating it as background work
+        with promoted(interview_id):
+            return await task
+    except Exception as e:
+        logging.warning(f"Precompute for interview {interview_id} failed: {e}")
+        return None
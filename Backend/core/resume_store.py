@@ -0,0 +1,39 @@
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+
+from core.database import AsyncSessionLocal
+from core.pdf_extract import extract_pdf_text, upload_path
+from core.metrics import PDF_EXTRACTION_LATENCY
+from models.models import Resume, ResumeBlob
+
+# --- Content-addressed Resume Store ---
+# Recruiters upload the same resume against several job descriptions. The PDF's
+# sha256 identifies it, so a repeat upload skips parsing entirely and the new
+# Resume row just references the existing blob.
+
+async def get_or_create_blob(file: UploadFile, sha256: str, byte_size: int) -> ResumeBlob:
+    """Returns the blob for this PDF, extracting its text only the first time it is seen."""
+    async with AsyncSessionLocal() as db:
+        blob = await db.get(ResumeBlob, sha256)
+    if blob is not None:
+        return blob
+
+    # Extraction can take seconds, so it runs outside any DB session
+    async with upload_path(file) as pdf_path:
+        with PDF_EXTRACTION_LATENCY.time():
+            raw_text = await extract_pdf_text(pdf_path)
+    blob = ResumeBlob(sha256=sha256, raw_text=raw_text, byte_size=byte_size)
+    async with AsyncSessionLocal() as db:
+        db.add(blob)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent upload of the same PDF stored it first
+            await db.rollback()
+            blob = await db.get(ResumeBlob, sha256)
+    return blob
+
+async def load_resume(interview_id: int) -> Resume | None:
+    """Loads a Resume (with its blob) in a short-lived session; the result is detached."""
+    async with AsyncSessionLocal() as db:
+        return await db.get(Resume, interview_id)
@@ -0,0 +1,136 @@
+import asyncio
+import itertools
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from core.config import SCHEDULER_AGING_SECONDS
+
+# --- Priority Scheduling of Model Calls ---
+# Each model's concurrency slots (see core/governor.py) are handed out by
+# priority rather than arrival order, so a burst of background work cannot add
+# seconds to a live candidate's wait:
+#   INTERACTIVE  questions, transcription and speech the candidate is waiting on
+#   ANALYSIS     sentiment, verification and summaries of answered turns
+#   REPORT       the final report narrative
+#   BACKGROUND   upload-time precompute, shadow comparisons and batch jobs
+# Within a priority, the interview with the fewest calls in flight goes first,
+# so one chatty session cannot starve the others. A waiter moves up one level
+# every SCHEDULER_AGING_SECONDS, so low-priority work is delayed, never starved.
+INTERACTIVE = 0
+ANALYSIS = 1
+REPORT = 2
+BACKGROUND = 3
+
+# Set per task (the WebSocket handler, a precompute task, ...) and inherited by
+# the tasks it creates
+current_interview: ContextVar[int | None] = ContextVar("current_interview", default=None)
+current_priority: ContextVar[int | None] = ContextVar("current_priority", default=None)
+
+@contextmanager
+def priority_scope(priority: int):
+    """Runs the enclosed calls at `priority` or lower (a scope can demote work, never promote it)."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+# Interviews whose low-priority work someone is now waiting on
+_promoted: set = set()
+
+@contextmanager
+def promoted(interview_id: int):
+    """While active, queued calls of this interview are ranked as INTERACTIVE."""
+    _promoted.add(interview_id)
+    try:
+        yield
+    finally:
+        _promoted.discard(interview_id)
+
+def effective_priority(priority: int) -> int:
+    scope = current_priority.get()
+    return priority if scope is None else max(priority, scope)
+
+class _Waiter:
+    __slots__ = ("priority", "key", "seq", "enqueued", "future")
+
+    def __init__(self, priority: int, key, seq: int, enqueued: float, future: asyncio.Future):
+        self.priority = priority
+        self.key = key
+        self.seq = seq
+        self.enqueued = enqueued
+        self.future = future
+
+class PriorityScheduler:
+    """A semaphore with `slots` permits that wakes waiters by (aged priority, key's calls in flight, arrival)."""
+
+    def __init__(self, slots: int, aging_seconds: float = SCHEDULER_AGING_SECONDS):
+        self.slots = slots
+        self.free = slots
+        self.aging_seconds = aging_seconds
+        self.in_flight: dict = {}
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _take(self, key):
+        self.free -= 1
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def _rank(self, waiter: _Waiter, now: float):
+        if waiter.key is not None and waiter.key in _promoted:
+            priority = INTERACTIVE
+        elif self.aging_seconds > 0:
+            priority = waiter.priority - int((now - waiter.enqueued) / self.aging_seconds)
+        else:
+            priority = waiter.priority
+        return (priority, self.in_flight.get(waiter.key, 0), waiter.seq)
+
+    def _wake(self):
+        now = asyncio.get_running_loop().time()
+        while self.free > 0 and self._waiters:
+            waiter = min(self._waiters, key=lambda w: self._rank(w, now))
+            self._waiters.remove(waiter)
+            if waiter.future.done():
+                continue
+            self._take(waiter.key)
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: int, key=None):
+        if self.free > 0 and not self._waiters:
+            self._take(key)
+            return
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, key, next(self._seq), loop.time(), loop.create_future())
+        self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Granted just before the cancellation: hand the slot on
+                self.release(key)
+            raise
+
+    def release(self, key=None):
+        count = self.in_flight.get(key, 0) - 1
+        if count > 0:
+            self.in_flight[key] = count
+        else:
+            self.in_flight.pop(key, None)
+        self.free += 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Holds one slot for the current interview at `priority` (lowered by any `priority_scope`)."""
+        key = current_interview.get()
+        await self.acquire(effective_priority(priority), key)
+        try:
+            yield
+        finally:
+            self.release(key)
@@ -0,0 +1,51 @@
+# --- Running Scorecard ---
+# Everything countable about the interview is tracked here, turn by turn, from
+# the verifier and sentiment results: questions asked, correct answers,
+# correctness per topic and the sentiment trend. Answers whose verification
+# failed (is_correct None) are counted as unscored and left out of the score
+# and topic counts. The final report takes its
+# numbers from the scorecard, so the closing LLM call only has to write the
+# narrative.
+
+def new_scorecard() -> dict:
+    return {"questions_asked": 0, "correct_answers": 0, "unscored": 0, "topics": {}, "sentiment_trend": []}
+
+def update_scorecard(scorecard: dict | None, verification: dict, sentiment: dict) -> dict:
+    """Returns a copy of the scorecard with one more answered question recorded."""
+    card = new_scorecard() if scorecard is None else {
+        **scorecard,
+        "topics": {topic: dict(counts) for topic, counts in scorecard["topics"].items()},
+        "sentiment_trend": list(scorecard["sentiment_trend"]),
+    }
+    card["questions_asked"] += 1
+    card["sentiment_trend"].append(sentiment.get("sentiment", "Unknown"))
+    if verification.get("is_correct") is None:
+        card["unscored"] = card.get("unscored", 0) + 1
+        return card
+
+    is_correct = bool(verification["is_correct"])
+    topic = (verification.get("topic") or "general").strip().lower() or "general"
+    card["correct_answers"] += int(is_correct)
+    counts = card["topics"].setdefault(topic, {"asked": 0, "correct": 0})
+    counts["asked"] += 1
+    counts["correct"] += int(is_correct)
+    return card
+
+def score(scorecard: dict) -> int:
+    """Overall score from 1-100: the share of assessed answers judged correct."""
+    scored = scorecard["questions_asked"] - scorecard.get("unscored", 0)
+    if scored <= 0:
+        return 1
+    return max(1, round(100 * scorecard["correct_answers"] / scored))
+
+def format_scorecard(scorecard: dict) -> str:
+    """Renders the scorecard as a few lines for the final scorer prompt."""
+    topics = ", ".join(
+        f"{topic} {counts['correct']}/{counts['asked']}" for topic, counts in scorecard["topics"].items()
+    )
+    return (
+        f"Answers judged correct: {scorecard['correct_answers']} of {scorecard['questions_asked']}"
+        f" ({scorecard.get('unscored', 0)} could not be assessed)\n"
+        f"Correct by topic: {topics or '(none)'}\n"
+        f"Sentiment trend: {' -> '.join(scorecard['sentiment_trend']) or '(none)'}"
+    )
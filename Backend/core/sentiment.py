@@ -0,0 +1,79 @@
+import re
+
+# --- Local Sentiment Classifier ---
+# A lexicon/feature classifier that labels an answer with the same labels as
+# the sentiment agent (Positive, Neutral, Negative, Confident, Hesitant) from
+# hedging words, filler, assertive phrasing, polarity words and answer length.
+# It runs in microseconds on the event loop, so SENTIMENT_BACKEND=local saves
+# a remote call per answer. With SENTIMENT_SHADOW_RATE > 0 a sample of answers
+# is also sent to the LLM and the agreement rate is tracked here.
+HEDGES = (
+    "maybe", "perhaps", "probably", "possibly", "might", "i think", "i guess", "i believe",
+    "not sure", "kind of", "sort of", "i suppose", "if i remember", "not really",
+)
+UNKNOWN = ("i don't know", "i do not know", "no idea", "not familiar", "never used", "can't remember")
+FILLERS = ("um", "uh", "er", "erm", "hmm", "you know", "i mean", "basically")
+ASSERTIVE = (
+    "definitely", "certainly", "clearly", "exactly", "absolutely", "always", "of course",
+    "i built", "i designed", "i implemented", "i led", "i wrote", "i created", "i optimized", "i have",
+)
+POSITIVE = ("enjoy", "love", "great", "excited", "happy", "interesting", "passionate", "proud", "glad", "fun")
+NEGATIVE = ("hate", "bad", "boring", "frustrat", "unfortunately", "difficult", "struggle", "fail", "annoy", "worst")
+
+_WORD = re.compile(r"[a-z']+")
+
+def _count(text: str, phrases: tuple[str, ...], prefix: bool = False) -> int:
+    """Counts whole-word occurrences (phrases may span several words), or words starting with them if `prefix`."""
+    end = "" if prefix else r"\b"
+    return sum(len(re.findall(rf"\b{re.escape(p)}{end}", text)) for p in phrases)
+
+def classify_sentiment(answer: str) -> dict:
+    """Returns a `SentimentAnalysis`-shaped dict for an answer."""
+    text = " " + " ".join(_WORD.findall(answer.lower())) + " "
+    words = max(1, len(text.split()))
+    hedges = _count(text, HEDGES)
+    unknown = _count(text, UNKNOWN)
+    fillers = _count(text, FILLERS)
+    assertive = _count(text, ASSERTIVE)
+    positive = _count(text, POSITIVE)
+    # NEGATIVE entries are stems ("frustrat" matches "frustrated", "frustrating")
+    negative = _count(text, NEGATIVE, prefix=True)
+    uncertainty = (hedges + fillers) / words
+
+    if unknown or uncertainty >= 0.08 or (words < 6 and hedges):
+        sentiment = "Hesitant"
+    elif negative >= 2 and negative > positive:
+        sentiment = "Negative"
+    elif assertive and hedges == 0 and words >= 12:
+        sentiment = "Confident"
+    elif positive > negative:
+        sentiment = "Positive"
+    elif negative > positive:
+        sentiment = "Negative"
+    else:
+        sentiment = "Neutral"
+
+    explanation = (
+        f"Local classifier: {words} words, {hedges + unknown} hedges, {fillers} fillers, "
+        f"{assertive} assertive, {positive} positive and {negative} negative phrases."
+    )
+    return {"sentiment": sentiment, "explanation": explanation}
+
+# --- Shadow Comparison with the LLM ---
+comparison_stats = {"compared": 0, "agreed": 0}
+
+def _label(sentiment: str) -> str:
+    words = _WORD.findall(sentiment.lower())
+    return words[0] if words else ""
+
+def record_comparison(local: dict, llm: dict) -> bool:
+    """Counts one local-vs-LLM comparison. Returns True when the labels agree."""
+    agreed = _label(local["sentiment"]) == _label(llm["sentiment"])
+    comparison_stats["compared"] += 1
+    comparison_stats["agreed"] += int(agreed)
+    return agreed
+
+def agreement_rate() -> float | None:
+    if not comparison_stats["compared"]:
+        return None
+    return comparison_stats["agreed"] / comparison_stats["compared"]
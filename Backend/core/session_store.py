@@ -0,0 +1,237 @@
+import abc
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from core.config import SESSION_STORE, SESSION_CACHE_SIZE, SESSION_REDIS_URL, SESSION_TTL_SECONDS
+from core.database import AsyncSessionLocal
+from models.models import InterviewSession, InterviewTurn
+
+# --- Interview Session Store ---
+# The interview state lives here between turns instead of only in the WebSocket
+# coroutine, so a reconnecting client resumes at its current question without
+# recomputing anything, and (with a shared backend) any worker can serve it.
+# Fields that come from the Resume row are not stored; they are reloaded on connect.
+RESUME_FIELDS = ("resume_text", "company_info", "job_description")
+
+def _portable(state: dict) -> dict:
+    return {key: value for key, value in state.items() if key not in RESUME_FIELDS}
+
+def _turn_count(state: dict) -> int:
+    return len(state.get("conversation_history", []))
+
+class SessionStore(abc.ABC):
+    @abc.abstractmethod
+    async def get(self, interview_id: int) -> dict | None:
+        """Returns the saved state of an interview, or None."""
+
+    @abc.abstractmethod
+    async def put(self, interview_id: int, state: dict):
+        """Saves the state of an interview, replacing any saved before."""
+
+    @abc.abstractmethod
+    async def put_if_current(self, interview_id: int, state: dict) -> bool:
+        """Saves the state unless the saved one has more answered turns (a reconnect
+        has moved the interview on). Returns whether it was saved."""
+
+    @abc.abstractmethod
+    async def delete(self, interview_id: int):
+        """Forgets an interview's state."""
+
+class InMemorySessionStore(SessionStore):
+    """Per-process LRU. Fastest, but only survives reconnects to the same worker."""
+
+    def __init__(self, max_sessions: int = SESSION_CACHE_SIZE):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[int, str] = OrderedDict()
+
+    async def get(self, interview_id: int) -> dict | None:
+        raw = self._sessions.get(interview_id)
+        if raw is None:
+            return None
+        self._sessions.move_to_end(interview_id)
+        return json.loads(raw)
+
+    async def put(self, interview_id: int, state: dict):
+        # Stored serialized so callers can't mutate the saved copy
+        self._sessions[interview_id] = json.dumps(_portable(state))
+        self._sessions.move_to_end(interview_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def put_if_current(self, interview_id: int, state: dict) -> bool:
+        saved = await self.get(interview_id)
+        if saved is not None and _turn_count(saved) > _turn_count(state):
+            return False
+        await self.put(interview_id, state)
+        return True
+
+    async def delete(self, interview_id: int):
+        self._sessions.pop(interview_id, None)
+
+# The database store does not rewrite the growing per-turn lists every turn:
+# the interview_turns log already holds them, so its row keeps the other
+# (small) fields plus the last few exchanges, which may not be logged yet (the
+# log is flushed in batches, and in background-analysis mode a turn is only
+# logged once analyzed). The lists are rebuilt from both on load.
+HISTORY_FIELDS = ("conversation_history", "sentiment_analyses", "verifications")
+RECENT_TURNS_KEPT = 8
+
+def _recent_turns(state: dict) -> list[dict]:
+    history = state.get("conversation_history", [])
+    sentiments = state.get("sentiment_analyses", [])
+    verifications = state.get("verifications", [])
+    # Every exchange whose analysis is still pending, and at least the last few
+    start = max(0, min(len(verifications), len(sentiments), len(history) - RECENT_TURNS_KEPT))
+    turns = []
+    for turn_index in range(start, len(history)):
+        turn = {"turn_index": turn_index, **history[turn_index]}
+        if turn_index < len(sentiments) and turn_index < len(verifications):
+            turn["sentiment"] = sentiments[turn_index]
+            turn["verification"] = verifications[turn_index]
+        turns.append(turn)
+    return turns
+
+def _rebuild_history(state: dict, turn_count: int, logged: list[InterviewTurn]):
+    """Restores the per-turn lists of a saved state from the turn log and its recent exchanges."""
+    turns = {turn.turn_index: {
+        "question": turn.question, "answer": turn.answer,
+        "sentiment": turn.sentiment, "verification": turn.verification,
+    } for turn in logged}
+    for turn in state.pop("recent_turns", []):
+        # The log is the durable record: a recent exchange only fills in what it lacks
+        logged_turn = turns.setdefault(turn["turn_index"], {})
+        for key in ("question", "answer", "sentiment", "verification"):
+            if logged_turn.get(key) is None and key in turn:
+                logged_turn[key] = turn[key]
+    state["conversation_history"] = []
+    state["sentiment_analyses"] = []
+    state["verifications"] = []
+    for turn_index in range(turn_count):
+        turn = turns.get(turn_index, {})
+        state["conversation_history"].append({"question": turn.get("question", ""), "answer": turn.get("answer", "")})
+    # Analyses finish in turn order, so the analyzed turns are a prefix of the history
+    for turn_index in range(turn_count):
+        turn = turns.get(turn_index, {})
+        if turn.get("sentiment") is None or turn.get("verification") is None:
+            break
+        state["sentiment_analyses"].append(turn["sentiment"])
+        state["verifications"].append(turn["verification"])
+
+class DatabaseSessionStore(SessionStore):
+    """Keeps state in the interview_sessions table of the app database (SQLite or Postgres)."""
+
+    async def get(self, interview_id: int) -> dict | None:
+        async with AsyncSessionLocal() as db:
+            row = await db.get(InterviewSession, interview_id)
+            if row is None:
+                return None
+            state = dict(row.state)
+            turn_count = row.turn_count or 0
+            logged = (await db.execute(
+                select(InterviewTurn)
+                .where(InterviewTurn.interview_id == interview_id, InterviewTurn.turn_index < turn_count)
+                .order_by(InterviewTurn.turn_index, InterviewTurn.id)
+            )).scalars().all()
+        _rebuild_history(state, turn_count, logged)
+        return state
+
+    @staticmethod
+    def _row_values(state: dict) -> dict:
+        saved = {key: value for key, value in _portable(state).items() if key not in HISTORY_FIELDS}
+        saved["recent_turns"] = _recent_turns(state)
+        return {"state": saved, "turn_count": _turn_count(state), "updated_at": datetime.utcnow()}
+
+    async def put(self, interview_id: int, state: dict):
+        async with AsyncSessionLocal() as db:
+            await db.merge(InterviewSession(interview_id=interview_id, **self._row_values(state)))
+            await db.commit()
+
+    async def put_if_current(self, interview_id: int, state: dict) -> bool:
+        values = self._row_values(state)
+        async with AsyncSessionLocal() as db:
+            # One conditional UPDATE, so a concurrent save can't slip in between check and write
+            result = await db.execute(
+                update(InterviewSession)
+                .where(
+                    InterviewSession.interview_id == interview_id,
+                    or_(InterviewSession.turn_count.is_(None), InterviewSession.turn_count <= values["turn_count"]),
+                )
+                .values(**values)
+            )
+            if result.rowcount:
+                await db.commit()
+                return True
+            if await db.get(InterviewSession, interview_id) is not None:
+                return False
+            db.add(InterviewSession(interview_id=interview_id, **values))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another connection saved it first
+                await db.rollback()
+                return False
+        return True
+
+    async def delete(self, interview_id: int):
+        async with AsyncSessionLocal() as db:
+            row = await db.get(InterviewSession, interview_id)
+            if row:
+                await db.delete(row)
+                await db.commit()
+
+class RedisSessionStore(SessionStore):
+    """Keeps state in Redis (or any Redis-protocol server) with a TTL. Requires the `redis` package."""
+
+    def __init__(self, url: str = SESSION_REDIS_URL, ttl_seconds: int = SESSION_TTL_SECONDS):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("SESSION_STORE=redis requires the 'redis' package (pip install redis).")
+        self._redis = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    # Compare-and-set in one round trip: Redis runs scripts atomically
+    _PUT_IF_CURRENT = """
+    local saved = redis.call('GET', KEYS[1])
+    if saved and #cjson.decode(saved)['conversation_history'] > tonumber(ARGV[2]) then
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+    return 1
+    """
+
+    @staticmethod
+    def _key(interview_id: int) -> str:
+        return f"interview:session:{interview_id}"
+
+    async def get(self, interview_id: int) -> dict | None:
+        raw = await self._redis.get(self._key(interview_id))
+        return json.loads(raw) if raw else None
+
+    async def put(self, interview_id: int, state: dict):
+        await self._redis.set(self._key(interview_id), json.dumps(_portable(state)), ex=self.ttl_seconds)
+
+    async def put_if_current(self, interview_id: int, state: dict) -> bool:
+        saved = await self._redis.eval(
+            self._PUT_IF_CURRENT, 1, self._key(interview_id),
+            json.dumps(_portable(state)), _turn_count(state), self.ttl_seconds,
+        )
+        return bool(saved)
+
+    async def delete(self, interview_id: int):
+        await self._redis.delete(self._key(interview_id))
+
+def create_session_store(backend: str = SESSION_STORE) -> SessionStore:
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "database":
+        return DatabaseSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    raise ValueError(f"Unknown SESSION_STORE '{backend}'. Use 'memory', 'database' or 'redis'.")
+
+session_store = create_session_store()
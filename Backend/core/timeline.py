@@ -0,0 +1,149 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from core.llm_cache import CacheMiss
+
+# --- Turn Timeline (Flight Recorder) ---
+# Every answered turn records when each stage ran:
+#   receive   waiting for the candidate's answer (from the moment it was asked)
+#   route     the router's continue/end decision
+#   analyze   sentiment, verification, scorecard and rolling summary steps
+#   question  generating (and streaming) the next question
+#   report    the final report narrative, on the last turn
+# plus one "llm" span per model request with its agent, model and token usage.
+# Spans are stored with the turn in interview_turns.timings as compact
+# [name, start_ms, duration_ms, {attrs}] lists, offsets relative to the moment
+# the question was asked, and served by GET /timeline/{interview_id}.
+# The active timeline is a context variable, so the background tasks a turn
+# starts (analysis, model calls) record into it too.
+current_timeline: ContextVar["TurnTimeline | None"] = ContextVar("current_timeline", default=None)
+
+class TurnTimeline:
+    """The spans of one turn. `finish()` marks the turn done; deferred work runs then."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: list[list] = []
+        self.turn_ms: int | None = None
+        self._on_finish: list = []
+
+    def _ms(self, moment: float) -> int:
+        return round((moment - self.origin) * 1000)
+
+    def add(self, name: str, started: float, ended: float | None = None, **attrs):
+        ended = time.perf_counter() if ended is None else ended
+        span = [name, self._ms(started), round((ended - started) * 1000)]
+        if attrs:
+            span.append(attrs)
+        self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        started = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.add(name, started, **attrs)
+
+    def finish(self, turn_ms: int):
+        """Records the turn latency and runs the callbacks waiting for the turn to end."""
+        self.turn_ms = turn_ms
+        callbacks, self._on_finish = self._on_finish, []
+        for callback in callbacks:
+            callback()
+
+    def when_finished(self, callback):
+        """Runs `callback` once the turn has finished (now, if it already has)."""
+        if self.turn_ms is None:
+            self._on_finish.append(callback)
+        else:
+            callback()
+
+    def to_dict(self) -> dict:
+        return {"turn_ms": self.turn_ms, "spans": sorted(self.spans, key=lambda span: span[1])}
+
+@contextmanager
+def stage(name: str, **attrs):
+    """Records the enclosed block as a span of the current turn's timeline, if there is one."""
+    timeline = current_timeline.get()
+    if timeline is None:
+        yield attrs
+        return
+    with timeline.span(name, **attrs) as span_attrs:
+        yield span_attrs
+
+def staged(name: str, step: str | None = None):
+    """Decorator form of `stage` for graph nodes (sync or async)."""
+    attrs = {"step": step} if step else {}
+
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def run_async(*args, **kwargs):
+                with stage(name, **attrs):
+                    return await func(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with stage(name, **attrs):
+                return func(*args, **kwargs)
+        return run
+    return decorate
+
+def expand_spans(timings: dict | None) -> list[dict]:
+    """The stored compact spans as readable dicts."""
+    return [
+        {"name": span[0], "start_ms": span[1], "duration_ms": span[2], **(span[3] if len(span) > 3 else {})}
+        for span in (timings or {}).get("spans", [])
+    ]
+
+class TimelineCallback(AsyncCallbackHandler):
+    """Adds an "llm" span per model request to the timeline of the turn that made it."""
+
+    def __init__(self):
+        self._started: dict[UUID, tuple[TurnTimeline, float, dict]] = {}
+
+    async def on_chat_model_start(self, serialized: dict[str, Any], messages, *, run_id: UUID, metadata=None, **kwargs):
+        timeline = current_timeline.get()
+        if timeline is None:
+            return
+        metadata = metadata or {}
+        model = (kwargs.get("invocation_params") or {}).get("model") or metadata.get("ls_model_name", "unknown")
+        attrs = {"agent": metadata.get("agent", "unknown"), "model": str(model).removeprefix("models/")}
+        self._started[run_id] = (timeline, time.perf_counter(), attrs)
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        timeline, began, attrs = started
+        for generations in response.generations:
+            for generation in generations:
+                if (generation.generation_info or {}).get("cached"):
+                    attrs["cached"] = True
+                    continue
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                if usage:
+                    attrs["in"] = attrs.get("in", 0) + usage.get("input_tokens", 0)
+                    attrs["out"] = attrs.get("out", 0) + usage.get("output_tokens", 0)
+        timeline.add("llm", began, **attrs)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        # A cache-only lookup that missed made no request; the real call records the span
+        if started is not None and not isinstance(error, CacheMiss):
+            timeline, began, attrs = started
+            timeline.add("llm", began, error=type(error).__name__, **attrs)
+
+timeline_callback = TimelineCallback()
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import insert, update
+
+from core.database import AsyncSessionLocal
+from models.models import InterviewTurn, Resume
+
+# --- Append-only Turn Log ---
+# Every answered turn becomes one interview_turns row as soon as it is analyzed,
+# so a crash loses at most the last flush interval instead of the whole session.
+# Rows from all live interviews are queued and committed together in batches
+# (one transaction per flush), keeping writes O(1) per turn.
+TURN_FLUSH_INTERVAL_SECONDS = 0.5
+TURN_MAX_BATCH = 200
+_STOP = object()
+
+class TurnLogWriter:
+    def __init__(self, flush_interval: float = TURN_FLUSH_INTERVAL_SECONDS, max_batch: int = TURN_MAX_BATCH):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def append(self, interview_id: int, turn_index: int, question: str, answer: str,
+               sentiment: dict | None = None, verification: dict | None = None, timings: dict | None = None):
+        """Queues one turn for the next batch. Never blocks."""
+        self._queue.put_nowait({
+            "interview_id": interview_id,
+            "turn_index": turn_index,
+            "question": question,
+            "answer": answer,
+            "sentiment": sentiment,
+            "verification": verification,
+            "timings": timings,
+            "created_at": datetime.utcnow(),
+        })
+
+    async def _next_batch(self) -> tuple[list[dict], bool]:
+        """Waits for a turn, then collects more for up to `flush_interval`. Returns (batch, stopping)."""
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _write(self, batch: list[dict]):
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(InterviewTurn), batch)
+                await db.commit()
+        except Exception as e:
+            logging.error(f"Failed to write {len(batch)} interview turns: {e}")
+
+    async def _run(self):
+        while True:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._write(batch)
+            if stopping:
+                return
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flushes everything still queued and stops the background writer."""
+        if self._task is not None:
+            self._queue.put_nowait(_STOP)
+            await self._task
+            self._task = None
+
+turn_log = TurnLogWriter()
+
+async def save_evaluation(interview_id: int, evaluation: dict):
+    """Stores the final report and sentiment analyses on the Resume row (one small write)."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Resume).where(Resume.interview_id == interview_id).values(evaluation=evaluation))
+        await db.commit()
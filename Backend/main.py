@@ -6,21 +6,45 @@ from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import your application's specific components
-from core.database import Base, engine
-from routes.pdf import pdf_router
+from core.database import async_engine, init_db
+from core.llm import init_llm_registry
+from core.llm_cache import llm_cache
+from core.metrics import start_snapshots, stop_snapshots
+from core.pdf_extract import shutdown_executor
+from core.turn_log import turn_log
+from routes.pdf import pdf_router, UploadSizeLimitMiddleware
 from routes.tech_interview import tech_ws_router
+from routes.metrics import metrics_router
+from routes.timeline import timeline_router
 # --- NEW: Import the router for serving the HTML page ---
 from routes.interview_page import page_router
 
+# Set by `python main.py` once it has run the schema setup, so the workers it
+# starts do not all run the DDL at the same time
+SCHEMA_READY_ENV = "INTERVIEWAI_SCHEMA_READY"
+
 # --- Lifespan Manager (for startup and shutdown events) ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Starting InterviewAI API...")
-    # Initialize the database
-    Base.metadata.create_all(bind=engine)
+    # Initialize the database (when not already done by the parent process)
+    if not os.getenv(SCHEMA_READY_ENV):
+        init_db()
+    # Build the shared LLM clients and chains once for all sessions
+    init_llm_registry()
+    # Start the batched writer for per-turn persistence
+    turn_log.start()
+    # Share this worker's metrics with the others (multi-worker runs)
+    start_snapshots()
     print("InterviewAI API started successfully!")
     yield
     print("Shutting down InterviewAI API...")
+    await turn_log.stop()
+    await stop_snapshots()
+    shutdown_executor()
+    if llm_cache is not None:
+        llm_cache.close()
+    await async_engine.dispose()
 
 # --- FastAPI App Initialization ---
 app = FastAPI(
@@ -38,6 +62,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Rejects oversized PDF uploads before their body is received and spooled
+app.add_middleware(UploadSizeLimitMiddleware, path_prefix="/pdf")
 
 # --- API Routers ---
 # Your existing routers for the WebSocket and PDF upload
@@ -45,6 +71,10 @@ app.include_router(tech_ws_router, prefix="/ws")
 app.include_router(pdf_router, prefix="/pdf")
 # --- NEW: Add the router that serves the /interview/{id} page ---
 app.include_router(page_router)
+# Prometheus scrape endpoint (all workers combined)
+app.include_router(metrics_router)
+# Per-turn span timelines of an interview
+app.include_router(timeline_router)
 
 # --- Static File Serving ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -59,12 +89,41 @@ async def read_upload_page():
 
 # --- Server Execution ---
 if __name__ == "__main__":
+    import glob
+    import shutil
+    import tempfile
     import uvicorn
+    from core.config import (
+        HOST, PORT, WEB_CONCURRENCY, SERVER_RELOAD,
+        MAX_REQUESTS_PER_WORKER, MAX_REQUESTS_JITTER, GRACEFUL_SHUTDOWN_SECONDS
+    )
     print("--- Starting Server ---")
-    print("Access the application at: http://127.0.0.1:8000")
+    print(f"Access the application at: http://127.0.0.1:{PORT}")
+    if WEB_CONCURRENCY > 1:
+        print(f"Running {WEB_CONCURRENCY} workers (reload disabled).")
+    # Schema setup runs once here, before any worker starts
+    init_db()
+    os.environ[SCHEMA_READY_ENV] = "1"
+    # The workers combine their /metrics through a shared directory, emptied
+    # first so counts from an earlier run are not added in
+    temp_metrics_dir = None
+    if WEB_CONCURRENCY > 1:
+        metrics_dir = os.getenv("METRICS_MULTIPROC_DIR")
+        if metrics_dir:
+            os.makedirs(metrics_dir, exist_ok=True)
+            for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+                os.remove(path)
+        else:
+            temp_metrics_dir = os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="interviewai-metrics-")
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
\ No newline at end of file
+        host=HOST,
+        port=PORT,
+        reload=SERVER_RELOAD,
+        workers=WEB_CONCURRENCY,
+        limit_max_requests=MAX_REQUESTS_PER_WORKER,
+        limit_max_requests_jitter=MAX_REQUESTS_JITTER,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS,
+    )
+    if temp_metrics_dir:
+        shutil.rmtree(temp_metrics_dir, ignore_errors=True)
@@ -1,12 +1,64 @@
-from sqlalchemy import Column, Integer, Text
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, JSON
+from sqlalchemy.orm import relationship
 from core.database import Base
 
+class ResumeBlob(Base):
+    """Extracted resume text, stored once per distinct PDF (keyed by the sha256 of its bytes)."""
+    __tablename__ = "resume_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    raw_text = Column(Text, nullable=False)
+    byte_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 class Resume(Base):
     __tablename__ = "resumes"
 
     interview_id = Column(Integer, primary_key=True, index=True)
+    # Legacy inline copy of the text; uploads now store "" here and reference a blob
     raw_resume = Column(Text, nullable=False)
     
     # --- NEW COLUMNS ---
     company_info = Column(Text, nullable=True)
-    job_description = Column(Text, nullable=True)
\ No newline at end of file
+    job_description = Column(Text, nullable=True)
+
+    # --- Cached context analysis (see core/context.py) ---
+    parsed_resume = Column(JSON, nullable=True)
+    context_cache_key = Column(String(64), nullable=True, index=True)
+
+    # --- Shared, content-addressed resume text (see core/resume_store.py) ---
+    blob_sha256 = Column(String(64), ForeignKey("resume_blobs.sha256"), nullable=True, index=True)
+    blob = relationship(ResumeBlob, lazy="joined")
+
+    # --- Final report and sentiment analyses, written once when the interview ends ---
+    evaluation = Column(JSON, nullable=True)
+
+    @property
+    def resume_text(self) -> str:
+        return self.blob.raw_text if self.blob is not None else self.raw_resume
+
+class InterviewTurn(Base):
+    """One question/answer exchange. Rows are only ever appended (see core/turn_log.py)."""
+    __tablename__ = "interview_turns"
+    __table_args__ = (Index("ix_interview_turns_interview_turn", "interview_id", "turn_index"),)
+
+    id = Column(Integer, primary_key=True)
+    interview_id = Column(Integer, ForeignKey("resumes.interview_id"), nullable=False)
+    turn_index = Column(Integer, nullable=False)
+    question = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    sentiment = Column(JSON, nullable=True)
+    verification = Column(JSON, nullable=True)
+    timings = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class InterviewSession(Base):
+    """Live interview state for the database-backed session store (core/session_store.py)."""
+    __tablename__ = "interview_sessions"
+
+    interview_id = Column(Integer, ForeignKey("resumes.interview_id"), primary_key=True)
+    state = Column(JSON, nullable=False)
+    # Answered turns in `state`, so a stale save can be refused (SessionStore.put_if_current)
+    turn_count = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
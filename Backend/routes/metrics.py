@@ -0,0 +1,68 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import register_collector, render
+from core.llm_cache import cache_stats
+from core.governor import governor_stats
+from core.llm import tiering_stats
+from core.sentiment import comparison_stats
+
+metrics_router = APIRouter()
+
+# --- Collectors for Counters Kept Elsewhere ---
+def _cache_metrics():
+    stats = cache_stats()
+    return [
+        ("interviewai_llm_cache_requests_total", "counter", "LLM cache lookups by result.", [
+            ({"result": "memory_hit"}, stats["memory_hits"]),
+            ({"result": "disk_hit"}, stats["disk_hits"]),
+            ({"result": "miss"}, stats["misses"]),
+        ]),
+        ("interviewai_llm_cache_writes_total", "counter", "Responses written to the LLM cache.", [({}, stats["writes"])]),
+    ]
+
+def _governor_metrics():
+    stats = governor_stats()
+    events = [
+        ({"model": model, "event": event}, model_stats[event])
+        for model, model_stats in stats.items()
+        for event in ("calls", "retries", "failures", "rejected", "parse_retries")
+    ]
+    return [
+        ("interviewai_governor_events_total", "counter", "Model calls, retries, failures and circuit-breaker rejections.", events),
+        ("interviewai_governor_in_flight", "gauge", "Model calls holding a concurrency slot.",
+         [({"model": model}, s["in_flight"]) for model, s in stats.items()]),
+        ("interviewai_governor_queued", "gauge", "Model calls waiting for a concurrency slot.",
+         [({"model": model}, s["queued"]) for model, s in stats.items()]),
+        ("interviewai_circuit_open", "gauge", "1 while a model's circuit breaker is not closed.",
+         [({"model": model}, int(s["breaker"] != "closed")) for model, s in stats.items()]),
+    ]
+
+def _tiering_metrics():
+    stats = tiering_stats()
+    return [
+        ("interviewai_tiered_calls_total", "counter", "Calls of fast/strong tiered agents.",
+         [({"agent": agent}, s["calls"]) for agent, s in stats.items()]),
+        ("interviewai_tiered_escalation_ratio", "gauge", "Share of tiered calls escalated to the strong model.",
+         [({"agent": agent}, s["escalation_rate"]) for agent, s in stats.items()]),
+        # Latencies are only known once each tier has been called at least once
+        ("interviewai_tiered_latency_saved_ms", "gauge", "Estimated latency saved vs. always using the strong model.",
+         [({"agent": agent}, s["latency_saved_ms"]) for agent, s in stats.items() if s["latency_saved_ms"] is not None]),
+        ("interviewai_tiered_avg_latency_ms", "gauge", "Average call latency per tier.",
+         [({"agent": agent, "tier": tier}, s[f"avg_{tier}_ms"])
+          for agent, s in stats.items() for tier in ("fast", "strong") if s[f"avg_{tier}_ms"] is not None]),
+    ]
+
+def _sentiment_metrics():
+    return [("interviewai_sentiment_shadow_comparisons_total", "counter", "Local-vs-LLM sentiment comparisons.", [
+        ({"result": "agreed"}, comparison_stats["agreed"]),
+        ({"result": "disagreed"}, comparison_stats["compared"] - comparison_stats["agreed"]),
+    ])]
+
+for _collect in (_cache_metrics, _governor_metrics, _tiering_metrics, _sentiment_metrics):
+    register_collector(_collect)
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint (merges every worker's metrics in multi-worker runs)."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
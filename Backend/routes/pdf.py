@@ -1,44 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-import fitz # PyMuPDF
+import json
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 
-from core.database import get_db
+from core.config import MAX_UPLOAD_BYTES
+from core.database import AsyncSessionLocal
 from models.models import Resume
+from core.precompute import schedule_precompute
+from core.pdf_extract import hash_upload, UploadTooLargeError, PDFExtractionTimeout
+from core.resume_store import get_or_create_blob
+from core.metrics import ERRORS
 
 pdf_router = APIRouter()
 
+# --- Request Size Limit ---
+# Starlette parses and spools the whole multipart body before the route runs,
+# so the upload cap is enforced on the request itself: by Content-Length when
+# the client sends it, otherwise while the body streams in.
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024  # form fields and part headers
+
+class UploadSizeLimitMiddleware:
+    """Answers 413 for request bodies over `max_bytes` under `path_prefix`, without reading them."""
+
+    def __init__(self, app, path_prefix: str = "/pdf", max_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.max_bytes = max_bytes
+
+    async def _reject(self, send):
+        ERRORS.inc(component="pdf", reason="too_large")
+        detail = f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+        await send({"type": "http.response.start", "status": 413, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = rejected = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Stops the body parser; whatever the app answers is replaced by the 413
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def limited_send(message):
+            nonlocal rejected
+            if not exceeded:
+                await send(message)
+            elif message["type"] == "http.response.start" and not rejected:
+                rejected = True
+                await self._reject(send)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not rejected:
+            await self._reject(send)
+
 @pdf_router.post("/upload_pdf")
 async def upload_pdf(
     # Use Form() to receive text fields alongside the file
     company_info: str = Form(...),
     job_description: str = Form(...),
-    file: UploadFile = File(...), 
-    db: Session = Depends(get_db)
+    file: UploadFile = File(...)
 ):
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF.")
 
+    # Hash the already-spooled upload (the size limit is also checked here, for bodies under the request cap)
     try:
-        # Extract text from the PDF
-        file_content = await file.read()
-        pdf_document = fitz.open(stream=file_content, filetype="pdf")
-        raw_text = "".join(page.get_text() for page in pdf_document)
-        pdf_document.close()
+        pdf_sha256, pdf_size = await hash_upload(file)
+    except UploadTooLargeError as e:
+        ERRORS.inc(component="pdf", reason="too_large")
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        # Extract text from the PDF in the worker pool, unless this exact PDF was seen before
+        blob = await get_or_create_blob(file, pdf_sha256, pdf_size)
 
         # Create a new Resume record with all the data
         db_resume = Resume(
-            raw_resume=raw_text,
+            raw_resume="",
+            blob_sha256=blob.sha256,
             company_info=company_info,
             job_description=job_description
         )
         
-        db.add(db_resume)
-        db.commit()
-        db.refresh(db_resume)
+        async with AsyncSessionLocal() as db:
+            db.add(db_resume)
+            await db.commit()
+
+        # Start the context analysis and opening question while the candidate navigates
+        schedule_precompute(db_resume.interview_id)
         
         # Return the ID of the newly created interview record
         return {"interview_id": db_resume.interview_id, "message": "Upload successful"}
 
+    except PDFExtractionTimeout as e:
+        ERRORS.inc(component="pdf", reason="timeout")
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        db.rollback()
+        ERRORS.inc(component="pdf", reason="error")
         raise HTTPException(status_code=500, detail=f"Failed to process file: {str(e)}")
\ No newline at end of file
@@ -1,37 +1,79 @@
 import os
 import json
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from models.models import Resume
-from core.database import get_db
-# Import the individual agent functions with the correct names
-from core.llm import (
-    context_analyzer_agent,
-    interviewer_agent,
-    sentiment_analyzer_agent,
-    verifier_agent,
-    router_agent,
-    final_scorer_agent
-)
+import logging
+import time
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from core.config import STREAM_QUESTIONS, BACKGROUND_ANALYSIS
+from core.analysis import BackgroundAnalyzer, run_turn_with_background_analysis, unanalyzed_turns
+from core.context import get_context_summary
+from core.precompute import take_precomputed
+from core.resume_store import load_resume
+from core.turn_log import turn_log, save_evaluation
+from core.session_store import session_store
+from core.scheduler import current_interview
+from core.metrics import ACTIVE_SESSIONS, ERRORS
+from core.timeline import TurnTimeline, current_timeline
+from core.graph import turn_graph, generate_question
 
 tech_ws_router = APIRouter()
 
+# The question arrives as {"type": "ai_response_delta"} messages while it is being
+# generated, followed by the usual {"type": "ai_response"} with the full text.
+def _delta_sender(websocket: WebSocket):
+    async def send_delta(delta: str):
+        await websocket.send_text(json.dumps({"type": "ai_response_delta", "text": delta}))
+    return send_delta
+
+# Background-analysis mode logs each turn once its analysis has finished
+def _turn_logger(interview_id: int):
+    def log_turn(turn_index: int, analysis: dict, analysis_ms: int, question: str, answer: str, timeline: TurnTimeline | None):
+        sentiment = analysis["sentiment_analyses"][turn_index]
+        verification = analysis["verifications"][turn_index]
+        append = lambda: turn_log.append(
+            interview_id,
+            turn_index=turn_index,
+            question=question,
+            answer=answer,
+            sentiment=sentiment,
+            verification=verification,
+            timings={**(timeline.to_dict() if timeline else {}), "analysis_ms": analysis_ms},
+        )
+        if timeline is None:
+            # Analyzed again after a reconnect; its timeline went with the old connection
+            append()
+        else:
+            # The analysis may finish before the next question is sent: wait for both
+            timeline.when_finished(append)
+    return log_turn
+
+async def _send_error(websocket: WebSocket, message: str):
+    await websocket.send_text(json.dumps({"type": "error", "text": message}))
+
+def _evaluation(interview_state: dict) -> dict:
+    return {
+        "final_report": interview_state.get("final_report", {}),
+        "sentiment_analyses": interview_state.get("sentiment_analyses", [])
+    }
+
 @tech_ws_router.websocket("/interview/{interview_id}")
 async def websocket_interview(
     websocket: WebSocket,
-    interview_id: int,
-    db: Session = Depends(get_db)
+    interview_id: int
 ):
     await websocket.accept()
+    # Model calls made for this connection (and its background tasks) are
+    # scheduled fairly against other interviews
+    current_interview.set(interview_id)
     
-    resume = db.query(Resume).filter(Resume.interview_id == interview_id).first()
+    # Short-lived session: nothing holds a DB connection for the length of the interview
+    resume = await load_resume(interview_id)
     if not resume:
         await websocket.close(code=1008)
         return
 
     # --- 1. Initialize State ---
     interview_state = {
-        "resume_text": resume.raw_resume,
+        "resume_text": resume.resume_text,
         "company_info": resume.company_info,
         "job_description": resume.job_description,
         "conversation_history": [],
@@ -39,55 +81,144 @@ async def websocket_interview(
         "sentiment_analyses": [],
     }
 
-    # --- 2. Run Context Analysis (once) ---
-    summary_update = context_analyzer_agent(interview_state)
-    interview_state.update(summary_update)
+    on_delta = _delta_sender(websocket) if STREAM_QUESTIONS else None
+
+    # --- 2. Resume a Session Already in Progress (reconnect or precomputed start) ---
+    # A precompute still running on this worker is awaited first
+    precomputed = await take_precomputed(interview_id)
+    saved_state = await session_store.get(interview_id) or precomputed
+    if saved_state and saved_state.get("final_report"):
+        # Already finished: just show the report again
+        await websocket.send_text(json.dumps({"type": "final_report", "data": saved_state["final_report"]}))
+        await websocket.close()
+        return
+    if saved_state:
+        interview_state.update(saved_state)
+    else:
+        try:
+            # --- 3. Load Context Analysis (cached per resume/JD pair) ---
+            interview_state["job_context_summary"] = await get_context_summary(resume)
+
+            # --- 4. Ask the First Question ---
+            question_update = await generate_question(interview_state, on_delta)
+        except Exception as e:
+            logging.error(f"Could not start interview {interview_id}: {e}")
+            ERRORS.inc(component="interview", stage="start")
+            await _send_error(websocket, "The interviewer is unavailable right now. Please try again in a moment.")
+            await websocket.close(code=1011)
+            return
+        interview_state.update(question_update)
+        await session_store.put(interview_id, interview_state)
 
-    # --- 3. Ask the First Question ---
-    question_update = interviewer_agent(interview_state)
-    interview_state.update(question_update)
     await websocket.send_text(json.dumps({"type": "ai_response", "text": interview_state["current_question"]}))
 
+    graph_config = {"configurable": {"on_question_delta": on_delta}}
+    analyzer = None
+    if BACKGROUND_ANALYSIS:
+        analyzer, taken_over = BackgroundAnalyzer.attach(interview_id, interview_state, websocket, _turn_logger(interview_id))
+        if taken_over:
+            # A reconnect to this worker: the old connection's analyses carry on here
+            interview_state.update(analyzer.state)
+        else:
+            # Turns whose analysis was still running when an earlier connection dropped
+            for turn_state in unanalyzed_turns(interview_state):
+                analyzer.submit(
+                    turn_state, question=turn_state["current_question"], answer=turn_state["candidate_answer"], timeline=None,
+                )
+    evaluation_saved = False
+    timeline = None
+    ACTIVE_SESSIONS.inc()
+
     try:
         while True:
-            # --- 4. Wait for User's Answer ---
+            # --- 5. Wait for the Candidate's Answer ---
+            # Each turn records a span timeline (core/timeline.py); the spans of a
+            # failed attempt stay on the timeline of the retried turn
+            if timeline is None:
+                timeline = TurnTimeline()
+                current_timeline.set(timeline)
+            wait_started = time.perf_counter()
             user_text = await websocket.receive_text()
-            
-            interview_state["candidate_answer"] = user_text
-            interview_state["conversation_history"].append({
-                "question": interview_state["current_question"], "answer": user_text
-            })
-            
-            # --- 5. Analyze and Verify the Answer ---
-            sentiment_update = sentiment_analyzer_agent(interview_state)
-            interview_state.update(sentiment_update)
-            
-            verify_update = verifier_agent(interview_state)
-            interview_state.update(verify_update)
-
-            # --- 6. Route to Next Step ---
-            next_action = router_agent(interview_state)
-
-            if next_action == "end_interview":
-                # --- 7a. Generate Final Report ---
-                final_report_update = final_scorer_agent(interview_state)
-                # Send the entire report object to the frontend
-                await websocket.send_text(json.dumps({"type": "final_report", "data": final_report_update["final_report"]}))
+            turn_started = time.perf_counter()
+            timeline.add("receive", wait_started, turn_started)
+
+            previous_state = interview_state
+            interview_state = {
+                **interview_state,
+                "candidate_answer": user_text,
+                "conversation_history": interview_state["conversation_history"] + [{
+                    "question": interview_state["current_question"], "answer": user_text
+                }],
+            }
+
+            try:
+                if analyzer is not None:
+                    # --- 6. Analyze in the Background, Ask the Next Question Now ---
+                    # Only the router and the interviewer are on the critical path;
+                    # the turn is logged when its analysis finishes.
+                    interview_state = await run_turn_with_background_analysis(
+                        interview_state, analyzer, on_delta,
+                        question=interview_state["current_question"], answer=user_text, timeline=timeline,
+                    )
+                else:
+                    # --- 6. Run the Turn Graph ---
+                    # The router decides first; sentiment, verification and the next
+                    # question (streamed as it is generated) then run concurrently.
+                    interview_state = await turn_graph.ainvoke(interview_state, config=graph_config)
+            except Exception as e:
+                # The model calls were already retried by the governor: keep the
+                # interview open and let the candidate answer the same question again
+                logging.error(f"Turn failed for interview {interview_id}: {e}")
+                ERRORS.inc(component="interview", stage="turn")
+                interview_state = previous_state
+                await _send_error(websocket, "Sorry, something went wrong while processing your answer. Please answer again.")
+                continue
+
+            timeline.finish(round((time.perf_counter() - turn_started) * 1000))
+            if analyzer is None:
+                # --- 7. Append the Turn to the Log (batched, non-blocking) ---
+                last_exchange = interview_state["conversation_history"][-1]
+                turn_log.append(
+                    interview_id,
+                    turn_index=len(interview_state["conversation_history"]) - 1,
+                    question=last_exchange["question"],
+                    answer=last_exchange["answer"],
+                    sentiment=interview_state["sentiment_analyses"][-1],
+                    verification=interview_state["verifications"][-1],
+                    timings=timeline.to_dict(),
+                )
+            timeline = None
+
+            # --- 8. Save the Session so a Reconnect Resumes Here ---
+            await session_store.put(interview_id, interview_state)
+
+            if interview_state["next_action"] == "end_interview":
+                # --- 9a. Save and Send the Final Report ---
+                await save_evaluation(interview_id, _evaluation(interview_state))
+                evaluation_saved = True
+                await websocket.send_text(json.dumps({"type": "final_report", "data": interview_state["final_report"]}))
                 break
             else:
-                # --- 7b. Ask the Next Question ---
-                question_update = interviewer_agent(interview_state)
-                interview_state.update(question_update)
+                # --- 9b. Ask the Next Question ---
                 await websocket.send_text(json.dumps({"type": "ai_response", "text": interview_state["current_question"]}))
 
     except WebSocketDisconnect:
-        print(f"Client for interview {interview_id} disconnected.")
+        logging.warning(f"Client for interview {interview_id} disconnected.")
     finally:
-        # Save final results to the database
-        resume.parsed_resume = interview_state.get("job_context_summary", {})
-        resume.evaluation = {
-            "final_report": interview_state.get("final_report", {}),
-            "sentiment_analyses": interview_state.get("sentiment_analyses", [])
-        }
-        db.commit()
-        await websocket.close()
\ No newline at end of file
+        ACTIVE_SESSIONS.dec()
+        is_current = True
+        if analyzer is not None:
+            # Let analyses still in flight finish so a reconnect resumes with them. A
+            # reconnect to this worker takes the analyzer (and the session) over; the
+            # analyses of any other reconnect are resubmitted from the saved session.
+            is_current = await analyzer.detach(interview_id, websocket)
+            if is_current and not evaluation_saved:
+                interview_state.update(analyzer.state)
+                # The client may have reconnected elsewhere and answered more meanwhile: keep its state
+                is_current = await session_store.put_if_current(interview_id, interview_state)
+            if not is_current:
+                logging.info(f"Interview {interview_id} continues on a newer connection; not saving the old connection's state.")
+        # Save partial results of an unfinished interview (turns are already in the turn log)
+        if is_current and not evaluation_saved:
+            await save_evaluation(interview_id, _evaluation(interview_state))
+        await websocket.close()
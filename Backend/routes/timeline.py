@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException
+from sqlalchemy import select
+
+from core.database import AsyncSessionLocal
+from core.timeline import expand_spans
+from models.models import InterviewTurn, Resume
+
+timeline_router = APIRouter()
+
+def _slowest_stage(spans: list[dict]) -> str | None:
+    # Waiting for the candidate and individual model requests are not stages of the turn
+    stages = [span for span in spans if span["name"] not in ("receive", "llm")]
+    if not stages:
+        return None
+    return max(stages, key=lambda span: span["duration_ms"])["name"]
+
+@timeline_router.get("/timeline/{interview_id}")
+async def get_interview_timeline(interview_id: int):
+    """
+    The flight recorder of an interview: for every answered turn, its latency
+    and the span timeline of its stages and model calls (see core/timeline.py).
+    """
+    async with AsyncSessionLocal() as db:
+        if await db.get(Resume, interview_id) is None:
+            raise HTTPException(status_code=404, detail="Interview not found.")
+        result = await db.execute(
+            select(InterviewTurn)
+            .where(InterviewTurn.interview_id == interview_id)
+            .order_by(InterviewTurn.turn_index, InterviewTurn.id)
+        )
+        turns = result.scalars().all()
+
+    timeline = []
+    for turn in turns:
+        timings = turn.timings or {}
+        spans = expand_spans(timings)
+        timeline.append({
+            "turn_index": turn.turn_index,
+            "question": turn.question,
+            "created_at": turn.created_at.isoformat(),
+            "turn_ms": timings.get("turn_ms"),
+            "analysis_ms": timings.get("analysis_ms"),
+            "slowest_stage": _slowest_stage(spans),
+            "spans": spans,
+        })
+    return {"interview_id": interview_id, "turns": timeline}
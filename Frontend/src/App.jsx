@@ -101,6 +101,8 @@ const InterviewPage = ({ interviewId, onInterviewComplete }) => {
       const data = JSON.parse(event.data);
       if (data.type === 'ai_response') {
         speak(data.text);
+      } else if (data.type === 'error') {
+        setStatus(data.text);
       } else if (data.type === 'final_report') {
         onInterviewComplete(data.data);
       }